@@ -1,130 +1,323 @@
 import os
-import json
-import threading
-import logging
-from fastapi import FastAPI, BackgroundTasks, HTTPException
+import asyncio
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, PlainTextResponse, FileResponse, Response
 import uvicorn
-import time
-import random
-from typing import List, Optional
+from typing import Optional
 
-# Import existing bot
-from facebook_bot import FacebookBot, BASE_DIR
+# Only browser-free modules here: selenium/undetected_chromedriver are imported by the
+# supervisor thread when the bot actually starts, so the dashboard comes up instantly.
+from paths import BASE_DIR
+from log_tail import read_since
+from log_stream import LogBroadcaster
+from image_inventory import get_inventory
+from metrics import registry as metrics_registry
+from driver_profiler import profiler as driver_profiler
+from group_cache import get_cache as get_group_cache
+from run_history import get_history
+from log_archive import setup_logging, iter_range, load_index, archive_dir_for, parse_time_arg
+from supervisor import BotSupervisor
+import driver_cache
+from memory_watchdog import watchdog as memory_watchdog
+from health_monitor import monitor as health_monitor
+from config_store import Config, get_store
+from image_cache import get_image_cache
+from artifact_store import get_artifact_store
+from selector_registry import get_selector_registry
+from cleanup_job import get_cleanup_job
+from log_analytics import get_analytics
+import events
+from stack_sampler import sampler as stack_sampler, collapsed as collapsed_stacks, top_functions
+
+setup_logging(os.path.join(BASE_DIR, "facebook_bot.log"))
 
 app = FastAPI(title="Facebook Bot GUI")
 
-# Global ref to bot thread
-bot_thread = None
-bot_instance = None
-is_running = False
-
-class Config(BaseModel):
-    email: str
-    password: str
-    group_url: Optional[str] = "" 
-    group_urls: List[str] = []
-    page_url: Optional[str] = ""
-    post_content: Optional[str] = ""
-    min_delay: int = 1
-    max_delay: int = 3
-    # New settings
-    between_groups_min: int = 60
-    between_groups_max: int = 180
-    loop_rest_min: int = 3600
-    loop_rest_max: int = 7200
-
-def run_bot_task():
-    global is_running, bot_instance
-    is_running = True
-    
-    while is_running:
-        try:
-            logging.info("--- STARTING NEW FULL CYCLE ---")
-            bot_instance = FacebookBot()
-            bot_instance.run(is_gui=True, continuous=True)
-            
-            # If run completes normally (is_active became False), break the outer loop
-            if not is_running or not getattr(bot_instance, 'is_active', True):
-                break
-                
-        except Exception as e:
-            logging.error(f"FATAL: Bot crashed during run: {e}. Restarting in 60s...")
-            if not is_running: break
-            time.sleep(60)
-            
-    logging.info("Background bot task terminated.")
-    is_running = False
+# Owns the bot thread, its driver and its lifecycle state
+supervisor = BotSupervisor(restart_delay=60)
 
 @app.get("/", response_class=HTMLResponse)
 async def index():
     with open(os.path.join(BASE_DIR, "static/index.html"), "r", encoding="utf-8") as f:
         return f.read()
 
+def config_store():
+    # Same cached store the bot reads from; saves are atomic and the bot sees the new version
+    return get_store(os.path.join(BASE_DIR, "config.json"))
+
 @app.get("/api/config")
 async def get_config():
-    config_path = os.path.join(BASE_DIR, "config.json")
-    if os.path.exists(config_path):
-        with open(config_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+    return config_store().get()
 
 @app.post("/api/config")
 async def save_config(config: Config):
-    config_path = os.path.join(BASE_DIR, "config.json")
-    with open(config_path, "w", encoding="utf-8") as f:
-        json.dump(config.dict(), f, indent=4, ensure_ascii=False)
+    try:
+        config_store().save(config.dict())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {"status": "success"}
 
-@app.get("/api/status")
-async def get_status():
-    pic_dir = os.path.join(BASE_DIR, "pic")
-    img_count = 0
-    if os.path.exists(pic_dir):
-        img_count = len([f for f in os.listdir(pic_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg'))])
+def build_status():
+    # Cached listing; pic/ is only rescanned when the folder's mtime changes
+    images = get_inventory(os.path.join(BASE_DIR, "pic")).summary()
+    images["preprocessed"] = get_image_cache(os.path.join(BASE_DIR, ".image_cache")).summary()
     
     return {
-        "running": is_running,
-        "image_count": img_count
+        "running": supervisor.is_running(),
+        "bot": supervisor.status(),
+        "driver_healthy": health_monitor.summary()["healthy"],
+        "memory": memory_watchdog.summary(last=30),
+        "image_count": images["count"],
+        "images": images,
+        "cleanup": cleanup_job().status(),
     }
 
+@app.get("/api/status")
+async def get_status():
+    return build_status()
+
 @app.post("/api/start")
-async def start_bot(background_tasks: BackgroundTasks):
-    global bot_thread, is_running
-    if is_running:
+async def start_bot():
+    if not supervisor.start():
         return {"status": "already running"}
-    
-    background_tasks.add_task(run_bot_task)
     return {"status": "started"}
 
 @app.post("/api/stop")
 async def stop_bot():
-    global bot_instance, is_running
-    if not is_running:
+    if not supervisor.stop():
         return {"status": "not running"}
-    
-    # Simple stop: quit driver if exists
-    if bot_instance:
-        bot_instance.is_active = False
-        if hasattr(bot_instance, 'driver'):
-            try:
-                bot_instance.driver.quit()
-            except:
-                pass
-    is_running = False
+    # The bot thread quits its own driver once its current sleep/wait is interrupted
     return {"status": "stopping"}
 
+@app.post("/api/pause")
+async def pause_bot():
+    if not supervisor.pause():
+        return {"status": "not running" if not supervisor.is_running() else "already paused"}
+    return {"status": "pausing"}
+
+@app.post("/api/resume")
+async def resume_bot():
+    # Not running (e.g. after a restart): starts and continues from the persisted checkpoint
+    was_running = supervisor.is_running()
+    if not supervisor.resume():
+        return {"status": "not paused"}
+    return {"status": "resumed" if was_running else "started"}
+
+def cleanup_job():
+    return get_cleanup_job(os.path.join(BASE_DIR, "cleanup_progress.json"))
+
+@app.post("/api/cleanup/start")
+async def start_cleanup():
+    """Delete pending posts in every configured group, on the poster's logged-in browser."""
+    config = config_store().get()
+    groups = config.get("group_urls") or ([config["group_url"]] if config.get("group_url") else [])
+    if not groups:
+        raise HTTPException(status_code=400, detail="No groups configured")
+    job = cleanup_job()
+    if not job.request(groups):
+        return {"status": "already running", "cleanup": job.status()}
+    if supervisor.is_running():
+        # Picked up at the poster's next idle point (resting between cycles, or paused)
+        return {"status": "queued", "cleanup": job.status()}
+    supervisor.start(mode="cleanup")
+    return {"status": "started", "cleanup": job.status()}
+
+@app.post("/api/cleanup/cancel")
+async def cancel_cleanup():
+    if not cleanup_job().cancel():
+        return {"status": "not running"}
+    return {"status": "cancelling"}
+
+@app.get("/api/cleanup")
+async def get_cleanup():
+    """Progress of the current/last cleanup job: per-group deletions, duration and failures."""
+    return cleanup_job().status()
+
+@app.on_event("shutdown")
+def shutdown_bot():
+    # Let the bot thread close Chrome itself before the process exits
+    supervisor.stop(timeout=10)
+
 @app.get("/api/logs")
-async def get_logs():
+async def get_logs(since: Optional[int] = None, inode: Optional[int] = None):
     log_path = os.path.join(BASE_DIR, "facebook_bot.log")
     if os.path.exists(log_path):
-        with open(log_path, "r", encoding="utf-8") as f:
-            # Read last 100 lines
-            lines = f.readlines()
-            return {"logs": "".join(lines[-100:])}
-    return {"logs": "No logs found."}
+        # Tail from the end (or from the client's cursor) instead of reading the whole file
+        return read_since(log_path, since=since, inode=inode, max_lines=100)
+    return {"logs": "No logs found.", "offset": 0, "inode": None, "reset": True}
+
+@app.get("/api/health")
+async def get_health():
+    """Cached driver liveness (probed in the background, never on request) and the last
+    success per bot phase. Responds 503 while the bot runs on a dead driver."""
+    driver = health_monitor.summary()
+    if not supervisor.is_running():
+        status = "stopped"
+    elif driver["healthy"] is False:
+        status = "unhealthy"
+    else:
+        status = "ok"
+    body = {
+        "status": status,
+        "bot": supervisor.status(),
+        "driver": driver,
+        "phases": metrics_registry.phase_health(),
+    }
+    return JSONResponse(body, status_code=503 if status == "unhealthy" else 200)
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """Per-phase duration histograms and outcome counters in Prometheus text format."""
+    return PlainTextResponse(metrics_registry.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/profile/webdriver")
+async def get_webdriver_profile(top: int = 20):
+    """Top-N WebDriver round trips by call site (needs profile_webdriver in config or FBBOT_PROFILE_WEBDRIVER=1)."""
+    return driver_profiler.summary(top_n=top)
+
+@app.post("/api/profile/webdriver/reset")
+async def reset_webdriver_profile():
+    driver_profiler.reset()
+    return {"status": "reset"}
+
+@app.get("/api/profile/sample")
+async def sample_bot_thread(seconds: float = 10, interval_ms: float = 10, format: str = "json", top: int = 25):
+    """Sample the bot thread's Python stack for `seconds`. format=collapsed returns
+    flamegraph.pl / speedscope input; json returns top self/inclusive functions too."""
+    thread = supervisor.thread
+    if thread is None or not thread.is_alive():
+        raise HTTPException(status_code=409, detail="Bot is not running")
+    if stack_sampler.busy:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    result = await asyncio.to_thread(stack_sampler.sample, thread.ident, seconds, interval_ms / 1000.0)
+    if result is None:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    if format == "collapsed":
+        return PlainTextResponse(collapsed_stacks(result))
+    return {
+        "samples": result["samples"],
+        "missed": result["missed"],
+        "duration": result["duration"],
+        "interval": result["interval"],
+        "top": top_functions(result, top),
+        "collapsed": collapsed_stacks(result),
+    }
+
+def group_status_cache():
+    return get_group_cache(os.path.join(BASE_DIR, "group_status.json"))
+
+@app.get("/api/group-cache")
+async def get_group_cache_status():
+    """Cached per-group pending status with hit/miss statistics."""
+    return group_status_cache().summary()
+
+@app.delete("/api/group-cache")
+async def invalidate_group_cache(url: Optional[str] = None, all: bool = False):
+    """Forget one group's cached status, or every group's with ?all=true."""
+    if not url and not all:
+        raise HTTPException(status_code=400, detail="Pass ?url=<group url>, or ?all=true to clear the whole cache")
+    removed = group_status_cache().invalidate(None if all and not url else url)
+    return {"status": "invalidated", "removed": removed}
+
+def run_history():
+    return get_history(os.path.join(BASE_DIR, "run_history.db"))
+
+@app.get("/api/history")
+async def get_run_history(page: int = 1, per_page: int = 50, group_url: Optional[str] = None, outcome: Optional[str] = None):
+    """Paginated group attempts, newest first."""
+    # sqlite queries (and waiting on the bot's writes) stay off the event loop that serves SSE
+    return await asyncio.to_thread(run_history().page, page=page, per_page=per_page, group_url=group_url, outcome=outcome)
+
+@app.get("/api/history/groups")
+async def get_history_groups(url: Optional[str] = None):
+    """Per-group summary: attempts, failures, last success time and duration."""
+    return {"groups": await asyncio.to_thread(run_history().group_summary, url)}
+
+def artifact_store():
+    return get_artifact_store(os.path.join(BASE_DIR, "artifacts"))
+
+@app.get("/api/artifacts")
+async def list_artifacts(kind: Optional[str] = None, history_id: Optional[int] = None, limit: int = 50):
+    """Failure screenshots, newest first; `history_id` links back to /api/history rows."""
+    store = artifact_store()
+    return {"artifacts": store.list(kind=kind, history_id=history_id, limit=max(1, min(limit, 500))), **store.summary()}
+
+@app.get("/api/artifacts/{artifact_id}/screenshot")
+async def get_artifact_screenshot(artifact_id: str):
+    path, _ = artifact_store().open(artifact_id, 'screenshot')
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return FileResponse(path)
+
+@app.get("/api/artifacts/{artifact_id}/dom")
+async def get_artifact_dom(artifact_id: str):
+    """Trimmed page source at the time of the failure, served as text so it isn't rendered."""
+    path, _ = artifact_store().open(artifact_id, 'dom')
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    with open(path, 'rb') as f:
+        return Response(f.read(), media_type="text/plain; charset=utf-8", headers={"Content-Encoding": "gzip"})
+
+def selector_registry():
+    return get_selector_registry(os.path.join(BASE_DIR, "selector_stats.json"))
+
+@app.get("/api/selectors")
+async def get_selector_stats():
+    """Hit rates per fallback selector chain; `stale` marks selectors that keep missing."""
+    return {"chains": selector_registry().stats()}
+
+@app.delete("/api/selectors")
+async def reset_selector_stats(chain: Optional[str] = None):
+    """Forget learned selector order (one chain, or all)."""
+    selector_registry().reset(chain)
+    return {"status": "success"}
+
+@app.get("/api/logs/range")
+async def get_logs_range(start: Optional[str] = None, end: Optional[str] = None):
+    """Stream log lines in [start, end) (epoch seconds or ISO time), opening only the archives that cover it."""
+    try:
+        start_ts = parse_time_arg(start)
+        end_ts = parse_time_arg(end)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start/end must be epoch seconds or ISO timestamps")
+    log_path = os.path.join(BASE_DIR, "facebook_bot.log")
+    return StreamingResponse(iter_range(log_path, start_ts, end_ts), media_type="text/plain; charset=utf-8")
+
+@app.get("/api/analytics")
+async def get_log_analytics(rebuild: bool = False):
+    """Outcomes, per-group attempts and phase durations rebuilt from the current and archived logs.
+    Only bytes not seen by a previous call are parsed."""
+    analytics = get_analytics(os.path.join(BASE_DIR, "facebook_bot.log"))
+    return await asyncio.to_thread(analytics.rebuild if rebuild else analytics.update)
+
+@app.get("/api/events")
+async def get_events(limit: int = 100, event: Optional[str] = None, group_url: Optional[str] = None):
+    """Recent structured events (events.jsonl): group_url, phase, outcome, duration, error class."""
+    items = events.recent(os.path.join(BASE_DIR, "events.jsonl"), max(1, min(limit, 1000)), event, group_url)
+    return {"events": items}
+
+@app.get("/api/logs/archives")
+async def get_log_archives():
+    """Compressed log archives and the time range each one covers."""
+    return {"archives": load_index(archive_dir_for(os.path.join(BASE_DIR, "facebook_bot.log")))}
+
+@app.get("/api/driver/startup")
+async def get_driver_startup():
+    """Recent driver start timings (cold = version detection + chromedriver patching, warm = cached)."""
+    return {"reports": list(driver_cache.startup_reports)}
+
+# One watcher shared by every dashboard tab
+log_broadcaster = LogBroadcaster(os.path.join(BASE_DIR, "facebook_bot.log"), build_status)
+
+@app.get("/api/stream")
+async def stream_events(request: Request):
+    """Server-Sent Events: pushes new log lines and status changes as they happen."""
+    return StreamingResponse(
+        log_broadcaster.events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # Mount static files
 app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static")
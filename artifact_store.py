@@ -0,0 +1,218 @@
+import io
+import os
+import re
+import gzip
+import json
+import time
+import hashlib
+import logging
+import threading
+
+from storage import PerPath, atomic_write_json
+
+try:
+    from PIL import Image
+except ImportError:
+    # Screenshots are then kept as the PNG the driver returns, deduplicated by exact hash
+    Image = None
+
+MAX_BYTES = 50 * 1024 * 1024
+MAX_DOM_BYTES = 512 * 1024
+SCREENSHOT_MAX_SIDE = 1280
+SCREENSHOT_QUALITY = 60
+# Average-hash distance (out of 64 bits) under which two captures count as the same screen
+DUPLICATE_DISTANCE = 4
+# Only compare against recent captures, a screen from days ago is worth keeping again
+DUPLICATE_WINDOW = 6 * 3600
+
+_SCRIPT_STYLE = re.compile(r'<(script|style|noscript)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_SVG = re.compile(r'<svg\b[^>]*>.*?</svg\s*>', re.IGNORECASE | re.DOTALL)
+
+
+def trim_dom(html, max_bytes=MAX_DOM_BYTES):
+    """Page source without scripts, styles and inline SVG, capped at max_bytes."""
+    html = _SCRIPT_STYLE.sub('', html)
+    html = _SVG.sub('<svg/>', html)
+    raw = html.encode('utf-8', 'replace')
+    if len(raw) > max_bytes:
+        raw = raw[:max_bytes] + b'\n<!-- truncated -->'
+    return raw
+
+
+def _average_hash(img):
+    small = img.convert('L').resize((8, 8))
+    pixels = list(small.getdata())
+    mean = sum(pixels) / len(pixels)
+    value = 0
+    for p in pixels:
+        value = (value << 1) | (1 if p >= mean else 0)
+    return f"{value:016x}"
+
+
+def _distance(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count('1')
+
+
+class ArtifactStore:
+    """Failure screenshots (and trimmed DOM snapshots) under one folder with a size cap.
+
+    Screenshots are downscaled and stored as JPEG when Pillow is available. A capture
+    that looks like a recent one of the same kind only bumps that artifact's counter, so a
+    failure repeating every group doesn't fill the disk. Past max_bytes the least recently
+    seen/opened artifacts are deleted first."""
+
+    def __init__(self, root, max_bytes=MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(root, 'index.json')
+        self._lock = threading.Lock()
+        self.items = self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return {item['id']: item for item in json.load(f)}
+        except Exception:
+            return {}
+
+    def _save(self):
+        os.makedirs(self.root, exist_ok=True)
+        atomic_write_json(self.index_path, list(self.items.values()), indent=1)
+
+    def _encode_screenshot(self, png):
+        """(bytes, extension, fingerprint) for a PNG screenshot."""
+        if Image is None:
+            return png, 'png', 'sha:' + hashlib.sha256(png).hexdigest()
+        with Image.open(io.BytesIO(png)) as img:
+            fingerprint = 'ahash:' + _average_hash(img)
+            img = img.convert('RGB')
+            img.thumbnail((SCREENSHOT_MAX_SIDE, SCREENSHOT_MAX_SIDE))
+            out = io.BytesIO()
+            img.save(out, 'JPEG', quality=SCREENSHOT_QUALITY, optimize=True)
+        return out.getvalue(), 'jpg', fingerprint
+
+    def _find_duplicate(self, kind, fingerprint, now):
+        scheme, value = fingerprint.split(':', 1)
+        for item in self.items.values():
+            if item['kind'] != kind or now - item['last_seen'] > DUPLICATE_WINDOW:
+                continue
+            other = item.get('fingerprint', '')
+            if not other.startswith(scheme + ':'):
+                continue
+            other = other.split(':', 1)[1]
+            if scheme == 'ahash':
+                if _distance(value, other) <= DUPLICATE_DISTANCE:
+                    return item
+            elif value == other:
+                return item
+        return None
+
+    def capture(self, driver, kind, group_url=None, history_id=None, dom=True):
+        """Screenshot (+ DOM) of the current page. Returns the artifact id, or None.
+        Never raises: this runs in error handlers."""
+        try:
+            png = driver.get_screenshot_as_png()
+            page_url = driver.current_url
+            page_source = driver.page_source if dom else None
+        except Exception as e:
+            logging.warning(f"Could not capture error screenshot: {e}")
+            return None
+        try:
+            return self.add(kind, png, page_source, group_url=group_url, page_url=page_url, history_id=history_id)
+        except Exception as e:
+            logging.warning(f"Could not store error screenshot: {e}")
+            return None
+
+    def add(self, kind, png, page_source=None, group_url=None, page_url=None, history_id=None):
+        now = time.time()
+        data, ext, fingerprint = self._encode_screenshot(png)
+        with self._lock:
+            dup = self._find_duplicate(kind, fingerprint, now)
+            if dup is not None:
+                dup['count'] += 1
+                dup['last_seen'] = now
+                dup['last_access'] = now
+                if history_id is not None:
+                    dup['history_ids'] = (dup.get('history_ids', []) + [history_id])[-20:]
+                self._save()
+                logging.info(f"Error screenshot matches artifact {dup['id']} (seen {dup['count']} times).")
+                return dup['id']
+
+            artifact_id = time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + '-' + hashlib.sha1(png).hexdigest()[:8]
+            os.makedirs(self.root, exist_ok=True)
+            files = {'screenshot': f"{artifact_id}.{ext}"}
+            with open(os.path.join(self.root, files['screenshot']), 'wb') as f:
+                f.write(data)
+            size = len(data)
+            if page_source:
+                dom_raw = gzip.compress(trim_dom(page_source))
+                files['dom'] = f"{artifact_id}.html.gz"
+                with open(os.path.join(self.root, files['dom']), 'wb') as f:
+                    f.write(dom_raw)
+                size += len(dom_raw)
+            self.items[artifact_id] = {
+                'id': artifact_id,
+                'kind': kind,
+                'created': now,
+                'last_seen': now,
+                'last_access': now,
+                'count': 1,
+                'group_url': group_url,
+                'page_url': page_url,
+                'history_ids': [history_id] if history_id is not None else [],
+                'fingerprint': fingerprint,
+                'files': files,
+                'bytes': size,
+            }
+            self._evict()
+            self._save()
+        logging.info(f"Saved error screenshot {artifact_id} ({size // 1024} KB).")
+        return artifact_id
+
+    def _evict(self):
+        total = sum(item['bytes'] for item in self.items.values())
+        for item in sorted(self.items.values(), key=lambda i: i['last_access']):
+            if total <= self.max_bytes or len(self.items) <= 1:
+                break
+            for name in item['files'].values():
+                try:
+                    os.remove(os.path.join(self.root, name))
+                except OSError:
+                    pass
+            total -= item['bytes']
+            del self.items[item['id']]
+
+    def list(self, kind=None, history_id=None, limit=50):
+        with self._lock:
+            items = [dict(i) for i in self.items.values()
+                     if (kind is None or i['kind'] == kind)
+                     and (history_id is None or history_id in i.get('history_ids', []))]
+        items.sort(key=lambda i: i['last_seen'], reverse=True)
+        for item in items:
+            item.pop('fingerprint', None)
+        return items[:limit]
+
+    def open(self, artifact_id, part='screenshot'):
+        """(path, item) for one file of an artifact; marks it as recently used."""
+        with self._lock:
+            item = self.items.get(artifact_id)
+            if item is None or part not in item['files']:
+                return None, None
+            item['last_access'] = time.time()
+            self._save()
+            return os.path.join(self.root, item['files'][part]), dict(item)
+
+    def summary(self):
+        with self._lock:
+            return {
+                "count": len(self.items),
+                "bytes": sum(i['bytes'] for i in self.items.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+
+_stores = PerPath(ArtifactStore)
+
+
+def get_artifact_store(root):
+    return _stores.get(root)
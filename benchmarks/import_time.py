@@ -0,0 +1,95 @@
+"""Cold-start import benchmark for the dashboard.
+
+Runs `python -X importtime -c "import app"` in fresh interpreters and reports the
+cumulative import time of app.py, the slowest modules, and whether any browser
+module (selenium / undetected_chromedriver) was pulled in.
+
+    python benchmarks/import_time.py                 # report
+    python benchmarks/import_time.py --save          # store as baseline
+    python benchmarks/import_time.py --check 1.25    # fail if >25% slower than baseline
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'import_time_baseline.json')
+BROWSER_MODULES = ('selenium', 'undetected_chromedriver')
+
+
+def measure(module):
+    """One cold import. Returns {module_name: (self_us, cumulative_us)}."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    timings = {}
+    for line in proc.stderr.splitlines():
+        # "import time:       123 |        456 |   package.module"
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        name = parts[2].strip()
+        timings[name] = (int(parts[0]), int(parts[1]))
+    return timings
+
+
+def run(module, repeat):
+    runs = [measure(module) for _ in range(repeat)]
+    totals = [r[module][1] for r in runs if module in r]
+    last = runs[-1]
+    slowest = sorted(last.items(), key=lambda kv: kv[1][0], reverse=True)[:15]
+    browser = sorted({name for name in last if name.split('.')[0] in BROWSER_MODULES})
+    return {
+        'module': module,
+        'repeat': repeat,
+        'median_ms': round(statistics.median(totals) / 1000, 1),
+        'min_ms': round(min(totals) / 1000, 1),
+        'modules_imported': len(last),
+        'browser_modules': browser,
+        'slowest_self_ms': [(name, round(s / 1000, 1)) for name, (s, _) in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save', action='store_true', help='store the result as the baseline')
+    parser.add_argument('--check', type=float, metavar='RATIO',
+                        help='exit 1 if median is more than RATIO x the baseline or a browser module is imported')
+    args = parser.parse_args()
+
+    result = run(args.module, args.repeat)
+    print(f"import {result['module']}: median {result['median_ms']} ms, min {result['min_ms']} ms "
+          f"over {result['repeat']} runs, {result['modules_imported']} modules")
+    print("browser modules imported: " + (", ".join(result['browser_modules']) or "none"))
+    print("slowest modules (self time):")
+    for name, ms in result['slowest_self_ms']:
+        print(f"  {ms:>8.1f} ms  {name}")
+
+    if args.save:
+        with open(BASELINE, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"Saved baseline to {BASELINE}")
+
+    if args.check:
+        failed = bool(result['browser_modules'])
+        if os.path.exists(BASELINE):
+            with open(BASELINE, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            limit = baseline['median_ms'] * args.check
+            print(f"baseline median {baseline['median_ms']} ms, limit {limit:.1f} ms")
+            failed = failed or result['median_ms'] > limit
+        sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
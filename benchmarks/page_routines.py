@@ -0,0 +1,215 @@
+"""Offline benchmark for the bot's page-handling routines.
+
+Serves the HTML stand-ins in benchmarks/fixtures/ from a local HTTP server and
+drives headless Chrome through check_pending_posts, navigate_to_pending_via_button,
+switch_to_page, create_post and find_delete_buttons with random_sleep stubbed out.
+No Facebook account or network access is needed. Reports wall time and WebDriver
+round trips per routine and checks each routine still returns the expected result.
+
+    python benchmarks/page_routines.py                 # report
+    python benchmarks/page_routines.py --save          # store as baseline
+    python benchmarks/page_routines.py --check 1.25    # fail if >25% slower / chattier than baseline
+
+The selector registry starts empty, so the first iteration pays the full fallback
+chains and later ones show the learned order. Login is not covered: it always
+starts at facebook.com.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import threading
+import statistics
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'page_routines_baseline.json')
+sys.path.insert(0, ROOT)
+
+# URL path -> fixture file. Group pages link to "my_pending_content" relative to themselves.
+ROUTES = {
+    '/groups/pending/': 'group.html',
+    '/groups/pending/my_pending_content': 'pending_has.html',
+    '/groups/empty/': 'group.html',
+    '/groups/empty/my_pending_content': 'pending_empty.html',
+    '/groups/broken/': 'group.html',
+    '/groups/broken/my_pending_content': 'pending_error.html',
+    '/groups/nobutton/': 'group_plain.html',
+    '/groups/nobutton/my_pending_content': 'pending_has.html',
+    '/page/': 'page_switch.html',
+}
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=FIXTURES, **kwargs)
+
+    def translate_path(self, path):
+        name = ROUTES.get(path.split('?', 1)[0])
+        return os.path.join(FIXTURES, name) if name else os.path.join(FIXTURES, '__missing__')
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, name='fixture-server', daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def make_driver(chromedriver=None):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--window-size=1280,900')
+    service = Service(executable_path=chromedriver) if chromedriver else Service()
+    return webdriver.Chrome(options=options, service=service)
+
+
+def make_bot(driver, base_url, work_dir):
+    """A FacebookBot wired to the local driver without config files, login or real sleeps."""
+    import facebook_bot
+    from selector_registry import SelectorRegistry
+
+    bot = facebook_bot.FacebookBot.__new__(facebook_bot.FacebookBot)
+    bot.stop_event = threading.Event()
+    bot.resume_event = threading.Event()
+    bot.resume_event.set()
+    bot.on_state = None
+    bot.config = {
+        'min_delay': 0,
+        'max_delay': 0,
+        'page_url': base_url + '/page/',
+        'post_content': 'Bài viết thử nghiệm',
+        'image_paths': [],
+    }
+    bot.driver = driver
+    bot.last_pending_probe = None
+    # Fresh registry per run so results don't depend on (or change) the bot's learned order
+    bot.selectors = SelectorRegistry(os.path.join(work_dir, 'selector_stats.json'))
+    bot.random_sleep = lambda *args, **kwargs: None
+    bot.sleep = lambda seconds: None
+    return bot
+
+
+def routines(bot, base_url):
+    """name -> (callable, expected result)."""
+    from delete_pending import find_delete_buttons
+
+    def delete_buttons():
+        bot.driver.get(base_url + '/groups/pending/my_pending_content')
+        return len(find_delete_buttons(bot))
+
+    return {
+        'check_pending_posts:has_pending': (lambda: bot.check_pending_posts(base_url + '/groups/pending/'), True),
+        'check_pending_posts:empty': (lambda: bot.check_pending_posts(base_url + '/groups/empty/'), False),
+        'check_pending_posts:error_page': (lambda: bot.check_pending_posts(base_url + '/groups/broken/'), False),
+        'navigate_to_pending:direct_url': (lambda: bot.navigate_to_pending_via_button(base_url + '/groups/nobutton/'), True),
+        'switch_to_page': (lambda: bot.switch_to_page(), None),
+        'create_post': (lambda: (bot.driver.get(base_url + '/groups/pending/'), bot.create_post())[1], None),
+        'find_delete_buttons': (delete_buttons, 3),
+    }
+
+
+def run(iterations, chromedriver=None):
+    from driver_profiler import DriverProfiler
+
+    server, base_url = start_server()
+    work_dir = tempfile.mkdtemp(prefix='fbbot-bench-')
+    driver = make_driver(chromedriver)
+    profiler = DriverProfiler()
+    profiler.attach(driver)
+    results = {}
+    try:
+        bot = make_bot(driver, base_url, work_dir)
+        for name, (func, expected) in routines(bot, base_url).items():
+            walls, trips, errors = [], [], []
+            for _ in range(iterations):
+                profiler.reset()
+                start = time.perf_counter()
+                try:
+                    value = func()
+                    if value != expected:
+                        errors.append(f"returned {value!r}, expected {expected!r}")
+                except Exception as e:
+                    errors.append(f"{type(e).__name__}: {e}")
+                walls.append(time.perf_counter() - start)
+                trips.append(profiler.summary()['total']['round_trips'])
+            results[name] = {
+                'first_s': round(walls[0], 3),
+                'median_s': round(statistics.median(walls), 3),
+                'round_trips': int(statistics.median(trips)),
+                'first_round_trips': trips[0],
+                'errors': errors[:3],
+            }
+    finally:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        server.shutdown()
+    return {'iterations': iterations, 'routines': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--chromedriver', default=os.environ.get('CHROMEDRIVER'),
+                        help='chromedriver binary (default: $CHROMEDRIVER or selenium\'s lookup)')
+    parser.add_argument('--save', action='store_true', help='store the result as the baseline')
+    parser.add_argument('--check', type=float, metavar='RATIO',
+                        help='exit 1 if a routine fails, or its median time / round trips exceed RATIO x the baseline')
+    parser.add_argument('--verbose', action='store_true', help='show the bot\'s log output')
+    args = parser.parse_args()
+
+    import facebook_bot  # noqa: F401  (configures logging on import)
+    # Keep benchmark runs out of facebook_bot.log and events.jsonl
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    import events
+    for handler in list(events.logger.handlers):
+        events.logger.removeHandler(handler)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    result = run(max(1, args.iterations), args.chromedriver)
+    print(f"{'routine':<36} {'first s':>8} {'median s':>9} {'trips':>6} {'1st trips':>9}")
+    for name, r in result['routines'].items():
+        print(f"{name:<36} {r['first_s']:>8.3f} {r['median_s']:>9.3f} {r['round_trips']:>6} {r['first_round_trips']:>9}"
+              + ("  FAILED: " + "; ".join(r['errors']) if r['errors'] else ""))
+
+    if args.save:
+        with open(BASELINE, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"Saved baseline to {BASELINE}")
+
+    if args.check:
+        failed = any(r['errors'] for r in result['routines'].values())
+        if os.path.exists(BASELINE):
+            with open(BASELINE, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)['routines']
+            for name, r in result['routines'].items():
+                base = baseline.get(name)
+                if not base:
+                    continue
+                slow = r['median_s'] > base['median_s'] * args.check
+                chatty = r['round_trips'] > base['round_trips'] * args.check
+                if slow or chatty:
+                    print(f"REGRESSION {name}: {r['median_s']}s / {r['round_trips']} trips "
+                          f"vs baseline {base['median_s']}s / {base['round_trips']} trips")
+                    failed = True
+        sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
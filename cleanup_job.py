@@ -0,0 +1,199 @@
+import os
+import json
+import time
+import logging
+import threading
+
+from storage import PerPath, atomic_write_json
+
+# Job states
+IDLE = "idle"
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+INTERRUPTED = "interrupted"
+
+# Per-group states
+GROUP_PENDING = "pending"
+GROUP_RUNNING = "running"
+GROUP_DONE = "done"
+GROUP_FAILED = "failed"
+GROUP_UNREACHABLE = "unreachable"
+
+UNFINISHED = (QUEUED, RUNNING, INTERRUPTED)
+
+
+class CleanupJob:
+    """Pending-post cleanup that runs on the bot's own (already logged-in) browser.
+
+    The API only queues the job; the bot thread picks it up at an idle point (resting
+    between cycles, or paused) so the driver is never used from two threads. Progress
+    is written after every group and deletion, so a job interrupted by a stop, crash
+    or restart continues with the first unfinished group once it is requested again."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.requested = threading.Event()
+        self.cancel_event = threading.Event()
+        self.progress = self._load()
+        if self.progress and self.progress.get("state") in UNFINISHED:
+            # Deleting is irreversible: only resume when asked to via /api/cleanup/start
+            self.progress["state"] = INTERRUPTED
+            logging.info("Unfinished cleanup job found; start cleanup again to resume it.")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.warning(f"Could not read cleanup progress: {e}")
+            return None
+
+    def _save(self):
+        try:
+            # fsync'd: the progress is what keeps a resumed job from redoing finished groups
+            atomic_write_json(self.path, self.progress, fsync=True)
+        except Exception as e:
+            logging.warning(f"Failed to save cleanup progress: {e}")
+
+    def request(self, groups):
+        """Queue a cleanup of `groups`. An unfinished job over the same groups is resumed
+        instead of restarted. Returns False if a job is already running."""
+        with self._lock:
+            current = self.progress
+            if current and current.get("state") == RUNNING:
+                return False
+            same = current and [g["url"] for g in current["groups"]] == list(groups)
+            if same and current.get("state") in UNFINISHED:
+                current["state"] = QUEUED
+            else:
+                self.progress = {
+                    "id": time.strftime('%Y%m%d-%H%M%S'),
+                    "state": QUEUED,
+                    "requested_at": time.time(),
+                    "started_at": None,
+                    "finished_at": None,
+                    "groups": [{"url": url, "state": GROUP_PENDING, "deleted": 0,
+                                "duration": None, "error": None} for url in groups],
+                }
+            self.cancel_event.clear()
+            self._save()
+            self.requested.set()
+        logging.info(f"Cleanup of {len(groups)} groups queued.")
+        return True
+
+    def cancel(self):
+        with self._lock:
+            if not self.progress or self.progress.get("state") not in UNFINISHED:
+                return False
+            self.cancel_event.set()
+            if self.progress["state"] != RUNNING:
+                # Not picked up yet: cancel right away
+                self.requested.clear()
+                self.progress["state"] = CANCELLED
+                self.progress["finished_at"] = time.time()
+                self._save()
+        return True
+
+    def run(self, bot):
+        """Run (or resume) the queued job. Must be called on the bot thread."""
+        from delete_pending import delete_all_pending
+
+        with self._lock:
+            if not self.requested.is_set() or not self.progress:
+                return None
+            self.requested.clear()
+            job = self.progress
+            job["state"] = RUNNING
+            job["started_at"] = job.get("started_at") or time.time()
+            self._save()
+        logging.info(f"==========> Cleanup job {job['id']} started <==========")
+
+        try:
+            for group in job["groups"]:
+                if group["state"] in (GROUP_DONE, GROUP_UNREACHABLE):
+                    continue
+                if self.cancel_event.is_set():
+                    break
+                with self._lock:
+                    group["state"] = GROUP_RUNNING
+                    self._save()
+                started = time.time()
+                # Deletions from an earlier, interrupted attempt at this group
+                base = group["deleted"]
+
+                def on_deleted(count, group=group, base=base):
+                    with self._lock:
+                        group["deleted"] = base + count
+                        self._save()
+
+                try:
+                    result = delete_all_pending(bot, group["url"], should_stop=self.cancel_event.is_set,
+                                                on_deleted=on_deleted)
+                    with self._lock:
+                        group["deleted"] = base + result["deleted"]
+                        group["error"] = result["error"]
+                        if not result["reachable"]:
+                            group["state"] = GROUP_UNREACHABLE
+                        else:
+                            group["state"] = GROUP_FAILED if result["error"] else GROUP_DONE
+                except Exception as e:
+                    logging.error(f"Cleanup failed for {group['url']}: {e}")
+                    with self._lock:
+                        group["state"] = GROUP_FAILED
+                        group["error"] = f"{type(e).__name__}: {e}"
+                with self._lock:
+                    group["duration"] = round(time.time() - started, 1)
+                    self._save()
+                if group["deleted"] > base:
+                    # The cached "has pending" status is stale now
+                    bot.group_cache.invalidate(group["url"])
+        except BaseException:
+            # Stopped mid-group: leave it for the next run
+            with self._lock:
+                job["state"] = INTERRUPTED
+                self._save()
+            raise
+
+        with self._lock:
+            job["state"] = CANCELLED if self.cancel_event.is_set() else DONE
+            job["finished_at"] = time.time()
+            self._save()
+        total = sum(g["deleted"] for g in job["groups"])
+        logging.info(f"==========> Cleanup job {job['id']} {job['state']}: {total} pending posts deleted <==========")
+        return job
+
+    def status(self):
+        with self._lock:
+            job = self.progress
+            if not job:
+                return {"state": IDLE}
+            groups = [dict(g) for g in job["groups"]]
+            state = job["state"]
+        started = job.get("started_at")
+        end = job.get("finished_at") or (time.time() if state == RUNNING else None)
+        return {
+            "id": job["id"],
+            "state": state,
+            "requested_at": job.get("requested_at"),
+            "started_at": started,
+            "finished_at": job.get("finished_at"),
+            "duration": round(end - started, 1) if started and end else None,
+            "deleted": sum(g["deleted"] for g in groups),
+            "groups_total": len(groups),
+            "groups_done": sum(1 for g in groups if g["state"] in (GROUP_DONE, GROUP_UNREACHABLE)),
+            "groups_failed": sum(1 for g in groups if g["state"] == GROUP_FAILED),
+            "current": next((g["url"] for g in groups if g["state"] == GROUP_RUNNING), None),
+            "groups": groups,
+        }
+
+
+_jobs = PerPath(CleanupJob)
+
+
+def get_cleanup_job(path):
+    return _jobs.get(path)
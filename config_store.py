@@ -0,0 +1,138 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from typing import List, Optional
+
+from memory_watchdog import DEFAULT_BUDGET_MB
+from storage import PerPath, atomic_write_json
+
+try:
+    from pydantic import BaseModel, ValidationError
+except ImportError:
+    # The CLI bot can run without pydantic; config is then used unvalidated
+    BaseModel = None
+    ValidationError = None
+
+
+if BaseModel is not None:
+    class Config(BaseModel):
+        email: str
+        password: str
+        group_url: Optional[str] = ""
+        group_urls: List[str] = []
+        page_url: Optional[str] = ""
+        post_content: Optional[str] = ""
+        min_delay: int = 1
+        max_delay: int = 3
+        # New settings
+        between_groups_min: int = 60
+        between_groups_max: int = 180
+        loop_rest_min: int = 3600
+        loop_rest_max: int = 7200
+        profile_webdriver: bool = False
+        memory_budget_mb: int = DEFAULT_BUDGET_MB
+        recycle_every_cycles: int = 0
+        pending_cache_ttl: int = 1800
+        posted_cache_ttl: int = 0
+        image_max_side: int = 2048
+        image_quality: int = 85
+else:
+    Config = None
+
+
+def validate(data):
+    """Validate with the Config model; returns the normalised dict (raises ValueError)."""
+    if Config is None:
+        return dict(data)
+    try:
+        model = Config(**data)
+    except ValidationError as e:
+        raise ValueError(str(e))
+    return model.model_dump() if hasattr(model, 'model_dump') else model.dict()
+
+
+class ConfigStore:
+    """Parsed config.json cached in memory. A lookup costs one stat(); the file is only
+    re-read when its mtime/size change, and only re-parsed when its content hash changes.
+    Writes go through a temp file + rename so readers never see a half-written file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._stat = None
+        self._hash = None
+        self._data = None
+        # Bumped on every content change; the bot compares it once per cycle
+        self.version = 0
+
+    def _file_stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def refresh(self):
+        """Reload if the file changed on disk. Returns True when the content changed."""
+        stat = self._file_stat()
+        with self._lock:
+            if self._data is not None and stat == self._stat:
+                return False
+            if stat is None:
+                changed = self._data is None or self._data != {}
+                self._stat, self._hash = None, None
+                if changed:
+                    self._apply({})
+                return changed
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+            self._stat = stat
+            if digest == self._hash:
+                # Touched but not modified
+                return False
+            try:
+                data = json.loads(raw.decode('utf-8'))
+            except ValueError as e:
+                if self._data is None:
+                    raise
+                # Probably mid-edit by hand: keep the last good config and retry next time
+                logging.warning(f"config.json is not valid JSON, keeping previous config: {e}")
+                self._hash = digest
+                return False
+            try:
+                validate(data)
+            except ValueError as e:
+                logging.warning(f"config.json failed validation: {e}")
+            self._hash = digest
+            self._apply(data)
+            return True
+
+    def _apply(self, data):
+        self._data = data
+        self.version += 1
+
+    def get(self):
+        """Current config (a copy, so callers may add derived keys)."""
+        self.refresh()
+        with self._lock:
+            return json.loads(json.dumps(self._data))
+
+    def save(self, data):
+        """Validate and atomically replace config.json."""
+        data = validate(data)
+        with self._lock:
+            raw = atomic_write_json(self.path, data, fsync=True, indent=4)
+            self._stat = self._file_stat()
+            self._hash = hashlib.sha256(raw).hexdigest()
+            self._apply(data)
+        return data
+
+
+_stores = PerPath(ConfigStore)
+
+
+def get_store(path):
+    return _stores.get(path)
@@ -3,81 +3,13 @@ import time
 import logging
 import json
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
 
-from facebook_bot import FacebookBot, BASE_DIR
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-
-def navigate_to_pending(bot, group_url):
-    """Navigate to pending content by going to group page first, then clicking 'Quản lý bài viết'."""
-    bot.driver.get(group_url)
-    bot.random_sleep(3, 5)
-    
-    manage_selectors = [
-        "//span[contains(text(), 'Quản lý bài viết')]",
-        "//a[contains(text(), 'Quản lý bài viết')]",
-        "//span[contains(text(), 'Manage posts')]",
-        "//a[contains(text(), 'Manage posts')]",
-        "//a[contains(@href, 'my_pending_content')]",
-    ]
-    
-    for selector in manage_selectors:
-        try:
-            btn = WebDriverWait(bot.driver, 3).until(
-                EC.element_to_be_clickable((By.XPATH, selector))
-            )
-            btn.click()
-            bot.random_sleep(3, 5)
-            
-            # Sau khi bấm, nếu gặp lỗi "Trang này hiện không hiển thị" thì bấm Tải lại
-            try:
-                body_now = bot.driver.find_element(By.TAG_NAME, "body").text.lower()
-                if "trang này hiện không hiển thị" in body_now or "trang này không hiển thị" in body_now:
-                    reload_btn_xpath = "//div[@role='button' and contains(., 'Tải lại trang')]"
-                    r_btn = WebDriverWait(bot.driver, 5).until(
-                        EC.element_to_be_clickable((By.XPATH, reload_btn_xpath))
-                    )
-                    r_btn.click()
-                    logging.info("Gặp trang lỗi kỹ thuật, đã bấm 'Tải lại trang'.")
-                    bot.random_sleep(5, 7)
-            except:
-                pass
-
-            logging.info(f"Đã bấm nút 'Quản lý bài viết'.")
-            return True
-        except:
-            continue
-    
-    pending_url = group_url.rstrip('/') + "/my_pending_content"
-    logging.info(f"Không tìm thấy nút, thử URL trực tiếp: {pending_url}")
-    bot.driver.get(pending_url)
-    bot.random_sleep(4, 6)
-    
-    # Kiểm tra lỗi ở đây nữa nếu đi bằng URL trực tiếp
-    try:
-        body_now = bot.driver.find_element(By.TAG_NAME, "body").text.lower()
-        if "trang này hiện không hiển thị" in body_now or "trang này không hiển thị" in body_now:
-            reload_btn_xpath = "//div[@role='button' and contains(., 'Tải lại trang')]"
-            r_btns = bot.driver.find_elements(By.XPATH, reload_btn_xpath)
-            if r_btns:
-                r_btns[0].click()
-                logging.info("Gặp trang lỗi kỹ thuật (URL), đã bấm 'Tải lại trang'.")
-                bot.random_sleep(5, 7)
-    except:
-        pass
-    
-    body_text = bot.driver.find_element(By.TAG_NAME, "body").text.lower()
-    if "trang này không hiển thị" in body_text or "this page isn't available" in body_text or "liên kết đã hỏng" in body_text:
-        logging.warning(f"Trang pending không khả dụng cho {group_url}. Bỏ qua nhóm này.")
-        return False
-    
-    return True
-
+from paths import BASE_DIR
+import pending_rules
+import events
+from pending_rules import probe_page
 
 def js_click(driver, element):
     """Click using JavaScript to bypass elements blocking the click."""
@@ -96,35 +28,30 @@ def find_delete_buttons(bot):
     return [b for b in buttons if b.is_displayed()]
 
 
-def delete_all_pending(bot, url):
+def delete_all_pending(bot, url, should_stop=None, on_deleted=None):
+    """Xoá hết bài viết chờ của một nhóm trên phiên trình duyệt của bot.
+    Returns {"deleted", "reachable", "error"}; on_deleted(count) is called after each deletion."""
     logging.info(f"==========> Kiểm tra và xoá nhóm: {url} <==========")
+    started = time.time()
     
-    if not navigate_to_pending(bot, url):
+    if not bot.navigate_to_pending_via_button(url):
         logging.info("Không thể truy cập trang bài viết chờ. Bỏ qua nhóm này.")
-        return
-    
-    # Kiểm tra trạng thái rỗng trước
-    body_text = bot.driver.find_element(By.TAG_NAME, "body").text.lower()
-    if "không có bài" in body_text or "nothing to show" in body_text or "no posts to show" in body_text or "no pending posts" in body_text:
-        logging.info(f"Đã DỌN SẠCH (hoặc không có) bài viết chờ trong nhóm này.")
-        return
-    
-def delete_all_pending(bot, url):
-    logging.info(f"==========> Kiểm tra và xoá nhóm: {url} <==========")
-    
-    if not navigate_to_pending(bot, url):
-        logging.info("Không thể truy cập trang bài viết chờ. Bỏ qua nhóm này.")
-        return
+        events.emit('cleanup_group', group_url=url, phase='cleanup', outcome='unavailable',
+                    duration=time.time() - started, deleted=0)
+        return {"deleted": 0, "reachable": False, "error": None}
     
     deleted = 0
+    error = None
     consecutive_empty_checks = 0
     max_empty_checks = 3 # Thử scroll vài lần trước khi thực sự bỏ cuộc
     
     while True:
+        if should_stop and should_stop():
+            logging.info("Đã huỷ dọn dẹp, dừng ở nhóm này.")
+            break
         try:
             # 1. Kiểm tra trạng thái rỗng
-            body_text = bot.driver.find_element(By.TAG_NAME, "body").text.lower()
-            if "không có bài" in body_text or "nothing to show" in body_text or "no posts to show" in body_text or "no pending posts" in body_text:
+            if probe_page(bot.driver).get('state') == pending_rules.EMPTY:
                 logging.info(f"Đã DỌN SẠCH (hoặc không có) bài viết chờ trong nhóm này.")
                 break
                 
@@ -153,7 +80,7 @@ def delete_all_pending(bot, url):
                 bot.driver.execute_script(
                     "arguments[0].scrollIntoView({block: 'center', inline: 'nearest'});", btn
                 )
-                time.sleep(1)
+                bot.sleep(1)
                 
                 # Click nút Xóa
                 js_click(bot.driver, btn)
@@ -164,19 +91,20 @@ def delete_all_pending(bot, url):
                 
                 try:
                     # Chờ hộp thoại confirm hiện lên
-                    confirm_btn = WebDriverWait(bot.driver, 5).until(
+                    confirm_btn = bot.wait(5).until(
                         EC.element_to_be_clickable((By.XPATH, xpath_confirm))
                     )
                     js_click(bot.driver, confirm_btn)
                     deleted += 1
                     logging.info(f"Đã xoá bài thứ {deleted}...")
+                    if on_deleted:
+                        on_deleted(deleted)
                     
                     # Đợi bài biến mất khỏi danh sách (Fade out)
                     bot.random_sleep(3, 4) 
-                except:
+                except Exception:
                     # Nếu lỗi dialog, thử bấm ESC để đóng và tiếp tục
                     logging.warning("Không thấy nút Xác nhận xoá, đang đóng dialog...")
-                    from selenium.webdriver.common.keys import Keys
                     bot.driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.ESCAPE)
                     bot.random_sleep(1, 2)
             
@@ -188,12 +116,24 @@ def delete_all_pending(bot, url):
 
         except Exception as e:
             logging.error(f"Lỗi vòng lặp xoá: {e}")
+            error = f"{type(e).__name__}: {e}"
+            events.emit('cleanup_error', group_url=url, phase='cleanup', outcome='error', error=e)
             break
             
     logging.info(f"Hoàn tất nhóm! Tổng cộng đã xoá {deleted} bài bài viết chờ.")
+    events.emit('cleanup_group', group_url=url, phase='cleanup', outcome='error' if error else 'done',
+                duration=time.time() - started, deleted=deleted)
+    return {"deleted": deleted, "reachable": True, "error": error}
 
 
 def main():
+    # Standalone run (the dashboard runs the same job on the poster's browser via /api/cleanup)
+    from facebook_bot import FacebookBot
+    from log_archive import setup_logging
+    from cleanup_job import get_cleanup_job
+
+    # Same rotating log file as the poster, plus console output
+    setup_logging(os.path.join(BASE_DIR, 'facebook_bot.log'), console=True)
     print("Khởi động Tool Dọn Dẹp Bài Viết Chờ...")
     bot = FacebookBot()
     try:
@@ -202,18 +142,19 @@ def main():
         if bot.config.get('page_url'):
             bot.switch_to_page()
             
-        groups = bot.config.get('group_urls', [])
-        if not groups and bot.config.get('group_url'):
-            groups = [bot.config['group_url']]
-            
+        groups = bot.get_group_urls()
         if not groups:
             logging.error("Không tìm thấy danh sách nhóm nào trong cấu hình!")
             return
             
-        for url in groups:
-            delete_all_pending(bot, url)
+        # Resumes an interrupted run over the same groups instead of starting over
+        job = get_cleanup_job(os.path.join(BASE_DIR, 'cleanup_progress.json'))
+        job.request(groups)
+        job.run(bot)
             
         logging.info("==========> ĐÃ DỌN DẸP HOÀN TẤT TẤT CẢ CÁC NHÓM <==========")
+        if getattr(bot.driver, '_profiler', None):
+            bot.driver._profiler.end_cycle()
         
     except Exception as e:
         logging.error(f"Lỗi: {e}")
@@ -221,7 +162,7 @@ def main():
         logging.info("Đang đóng trình duyệt...")
         try:
             bot.driver.quit()
-        except:
+        except Exception:
             pass
 
 if __name__ == "__main__":
@@ -0,0 +1,193 @@
+import os
+import re
+import json
+import time
+import shutil
+import logging
+import platform
+import subprocess
+import threading
+from collections import deque
+
+from storage import atomic_write_json
+
+MAC_CHROME = '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'
+LINUX_CHROME_NAMES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+WINDOWS_CHROME_PATHS = (
+    r'%ProgramFiles%\Google\Chrome\Application\chrome.exe',
+    r'%ProgramFiles(x86)%\Google\Chrome\Application\chrome.exe',
+    r'%LocalAppData%\Google\Chrome\Application\chrome.exe',
+)
+
+# Recent startup timings (cold vs warm), exposed through the API
+startup_reports = deque(maxlen=20)
+
+
+def find_chrome_binary():
+    """Locate the browser binary: $CHROME_BINARY, then the usual per-OS locations."""
+    env = os.environ.get('CHROME_BINARY')
+    if env and os.path.exists(env):
+        return env
+    system = platform.system()
+    if system == 'Darwin':
+        return MAC_CHROME if os.path.exists(MAC_CHROME) else None
+    if system == 'Windows':
+        for path in WINDOWS_CHROME_PATHS:
+            path = os.path.expandvars(path)
+            if os.path.exists(path):
+                return path
+        return None
+    for name in LINUX_CHROME_NAMES:
+        path = shutil.which(name)
+        if path:
+            # Not realpath: /snap/bin/chromium is a symlink to /usr/bin/snap, which
+            # neither prints Chrome's version nor starts Chrome when run as-is
+            return path
+    return None
+
+
+def _fingerprint(binary):
+    """The file whose size/mtime change when the browser is updated: the symlink's
+    target, or for snap wrappers the current snap revision directory."""
+    target = os.path.realpath(binary)
+    if os.path.basename(target) == 'snap':
+        revision = os.path.realpath(os.path.join('/snap', os.path.basename(binary), 'current'))
+        if os.path.exists(revision):
+            return revision
+    return target
+
+
+def _query_version(binary):
+    if platform.system() == 'Windows':
+        # chrome.exe --version prints nothing on Windows; the registry has it
+        cmd = ['reg', 'query', 'HKEY_CURRENT_USER\\Software\\Google\\Chrome\\BLBeacon', '/v', 'version']
+        output = subprocess.check_output(cmd, stderr=subprocess.DEVNULL, timeout=10).decode('utf-8')
+    else:
+        output = subprocess.check_output([binary, '--version'], stderr=subprocess.DEVNULL, timeout=10).decode('utf-8')
+    # e.g. "Google Chrome 145.0.7632.117" / "Chromium 120.0.6099.224 snap"
+    match = re.search(r'(\d+)\.(\d+)\.(\d+)\.(\d+)', output)
+    if not match:
+        raise ValueError(f"Unrecognised version output: {output.strip()!r}")
+    return match.group(0)
+
+
+class DriverCache:
+    """Persistent cache of the detected browser version and the patched chromedriver,
+    keyed by the browser binary (path + size + mtime). Warm starts need one stat()
+    instead of a version subprocess plus undetected_chromedriver's download/patch."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self._lock = threading.Lock()
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        atomic_write_json(self.index_path, self.entries)
+
+    @staticmethod
+    def _key(binary):
+        if not binary:
+            return None
+        target = _fingerprint(binary)
+        st = os.stat(target)
+        return f"{binary}|{target}|{st.st_size}|{int(st.st_mtime)}"
+
+    def resolve(self):
+        """Returns dict(binary, version, version_main, driver_path, cached)."""
+        binary = find_chrome_binary()
+        try:
+            key = self._key(binary)
+        except OSError:
+            key = None
+        with self._lock:
+            entry = self.entries.get(key) if key else None
+            if entry:
+                driver_path = entry.get('driver_path')
+                if driver_path and not os.path.exists(driver_path):
+                    driver_path = None
+                return dict(entry, binary=binary, driver_path=driver_path, cached=True)
+
+        version = None
+        if binary or platform.system() == 'Windows':
+            try:
+                version = _query_version(binary)
+            except Exception as e:
+                logging.warning(f"Could not detect Chrome version: {e}")
+        result = {
+            'binary': binary,
+            'version': version,
+            'version_main': int(version.split('.')[0]) if version else None,
+            'driver_path': None,
+        }
+        if key and version:
+            with self._lock:
+                # Browser was updated: drop the stale entry for this path
+                self.entries = {k: v for k, v in self.entries.items() if not k.startswith(f"{binary}|")}
+                self.entries[key] = dict(result)
+                self._save()
+        return dict(result, cached=False)
+
+    def store_driver(self, resolution, patched_path):
+        """Keep a copy of the chromedriver undetected_chromedriver just patched for this browser version."""
+        if not patched_path or not resolution.get('version_main') or not os.path.exists(patched_path):
+            return None
+        try:
+            key = self._key(resolution.get('binary'))
+        except OSError:
+            return None
+        if not key:
+            return None
+        os.makedirs(self.cache_dir, exist_ok=True)
+        suffix = '.exe' if patched_path.lower().endswith('.exe') else ''
+        dest = os.path.join(self.cache_dir, f"chromedriver-{resolution['version_main']}{suffix}")
+        try:
+            if os.path.abspath(patched_path) != os.path.abspath(dest):
+                shutil.copy2(patched_path, dest)
+            os.chmod(dest, 0o755)
+        except OSError as e:
+            logging.warning(f"Could not cache patched chromedriver: {e}")
+            return None
+        with self._lock:
+            entry = self.entries.setdefault(key, {
+                'binary': resolution.get('binary'),
+                'version': resolution.get('version'),
+                'version_main': resolution.get('version_main'),
+            })
+            entry['driver_path'] = dest
+            self._save()
+        return dest
+
+    def invalidate(self):
+        with self._lock:
+            self.entries = {}
+            self._save()
+
+
+class StartupTimer:
+    """Collects per-step durations of a driver start and files them in startup_reports."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.steps = {}
+        self._last = self.start
+
+    def mark(self, step):
+        now = time.perf_counter()
+        self.steps[step] = round(now - self._last, 3)
+        self._last = now
+
+    def finish(self, **info):
+        report = dict(info, steps=self.steps, total=round(time.perf_counter() - self.start, 3), time=time.time())
+        startup_reports.append(report)
+        steps = ", ".join(f"{k} {v}s" for k, v in self.steps.items())
+        logging.info(f"Driver startup ({'warm' if info.get('warm') else 'cold'}): {report['total']}s [{steps}]")
+        return report
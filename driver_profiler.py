@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+import logging
+import threading
+from collections import deque
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+OTHER_SITE = "(other)"
+
+
+def _call_site(skip_dirs):
+    """First frame outside selenium/uc and this module, e.g. 'facebook_bot.py:create_post:572'."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename != __file__ and filename.startswith(PROJECT_DIR) and not any(d in filename for d in skip_dirs):
+            return f"{os.path.basename(filename)}:{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return OTHER_SITE
+
+
+class DriverProfiler:
+    """Counts and times every WebDriver command (each one is an HTTP round trip to
+    chromedriver) grouped by the bot code line that triggered it."""
+
+    def __init__(self, top_n=20, max_sites=1000, history=10):
+        self.top_n = top_n
+        self.max_sites = max_sites
+        self._lock = threading.Lock()
+        self.total = {}
+        self.cycle = {}
+        self.cycle_started = time.time()
+        # Rolling window of the last few cycle summaries
+        self.history = deque(maxlen=history)
+        self.skip_dirs = ("site-packages", "dist-packages", os.sep + "selenium" + os.sep)
+
+    def attach(self, driver):
+        """Wrap driver.execute. Every command, including WebElement calls such as .text,
+        is_displayed() and click(), goes through the parent driver's execute()."""
+        if getattr(driver, "_profiler", None) is self:
+            return driver
+        original = driver.execute
+
+        def execute(driver_command, params=None):
+            site = _call_site(self.skip_dirs)
+            start = time.perf_counter()
+            try:
+                return original(driver_command, params)
+            finally:
+                self.record(site, driver_command, time.perf_counter() - start)
+
+        driver.execute = execute
+        driver._profiler = self
+        logging.info("WebDriver profiler attached.")
+        return driver
+
+    def record(self, site, command, duration):
+        with self._lock:
+            for table in (self.total, self.cycle):
+                key = (site, command)
+                entry = table.get(key)
+                if entry is None:
+                    if len(table) >= self.max_sites:
+                        key = (OTHER_SITE, command)
+                        entry = table.get(key)
+                    if entry is None:
+                        entry = table[key] = [0, 0.0, 0.0]
+                entry[0] += 1
+                entry[1] += duration
+                entry[2] = max(entry[2], duration)
+
+    def _summarize(self, table, top_n):
+        rows = [
+            {"site": site, "command": command, "count": c, "total_s": round(t, 4),
+             "avg_ms": round(t / c * 1000, 2), "max_ms": round(m * 1000, 2)}
+            for (site, command), (c, t, m) in table.items()
+        ]
+        rows.sort(key=lambda r: r["total_s"], reverse=True)
+        return {
+            "round_trips": sum(r["count"] for r in rows),
+            "total_s": round(sum(r["total_s"] for r in rows), 4),
+            "top": rows[:top_n],
+        }
+
+    def summary(self, top_n=None):
+        top_n = top_n or self.top_n
+        with self._lock:
+            return {
+                "total": self._summarize(self.total, top_n),
+                "current_cycle": dict(self._summarize(self.cycle, top_n), started=self.cycle_started),
+                "recent_cycles": list(self.history),
+            }
+
+    def end_cycle(self):
+        """Log the cycle's chattiest call sites and start a new cycle window."""
+        with self._lock:
+            summary = dict(self._summarize(self.cycle, self.top_n), started=self.cycle_started, ended=time.time())
+            self.history.append(summary)
+            self.cycle = {}
+            self.cycle_started = time.time()
+        logging.info(f"WebDriver profile: {summary['round_trips']} round trips, {summary['total_s']}s in this cycle.")
+        for row in summary["top"][:10]:
+            logging.info(f"  {row['count']:>5} x {row['command']:<24} {row['total_s']:>8.2f}s  {row['site']}")
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self.total = {}
+            self.cycle = {}
+            self.cycle_started = time.time()
+            self.history.clear()
+
+
+def is_enabled(config=None):
+    if os.environ.get("FBBOT_PROFILE_WEBDRIVER", "").lower() in ("1", "true", "yes"):
+        return True
+    return bool((config or {}).get("profile_webdriver"))
+
+
+# Shared by the bot thread, delete_pending.py and the API
+profiler = DriverProfiler()
@@ -0,0 +1,98 @@
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from log_tail import tail_lines
+
+# Kept off the root logger: events go only to the JSONL sink, not the text log
+logger = logging.getLogger('fbbot.events')
+logger.propagate = False
+logger.setLevel(logging.INFO)
+
+FIELDS = ('ts', 'event', 'group_url', 'phase', 'outcome', 'duration', 'error')
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 5
+
+_setup_lock = threading.Lock()
+_listener = None
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record: the fixed FIELDS first, then any extra keys."""
+
+    def format(self, record):
+        data = dict(getattr(record, 'event_fields', None) or {})
+        data.setdefault('ts', record.created)
+        data.setdefault('event', record.getMessage())
+        ordered = {k: data.pop(k, None) for k in FIELDS}
+        ordered.update(data)
+        return json.dumps(ordered, ensure_ascii=False, default=str)
+
+
+def setup_events(path, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT):
+    """Attach the JSONL sink once. Callers only enqueue; a QueueListener thread does the
+    formatting and file I/O, so emitting never blocks the bot on disk."""
+    global _listener
+    path = os.path.abspath(path)
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+        file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        file_handler.setFormatter(JsonLineFormatter())
+        q = queue.SimpleQueue()
+        logger.addHandler(QueueHandler(q))
+        _listener = QueueListener(q, file_handler, respect_handler_level=False)
+        _listener.path = path
+        _listener.start()
+        # Flush what's still queued on interpreter exit
+        atexit.register(_listener.stop)
+        return _listener
+
+
+def emit(event, group_url=None, phase=None, outcome=None, duration=None, error=None, **extra):
+    """Record a structured event. `error` may be an exception (its class name is stored,
+    the message goes to error_message) or a class name string."""
+    fields = {
+        'ts': time.time(),
+        'event': event,
+        'group_url': group_url,
+        'phase': phase,
+        'outcome': outcome,
+        'duration': round(duration, 3) if duration is not None else None,
+        'error': None,
+    }
+    if isinstance(error, BaseException):
+        fields['error'] = type(error).__name__
+        fields['error_message'] = str(error)[:500]
+    elif error:
+        fields['error'] = str(error)
+    fields.update(extra)
+    try:
+        logger.info(event, extra={'event_fields': fields})
+    except Exception:
+        pass
+
+
+def recent(path, limit=100, event=None, group_url=None):
+    """Last events from the JSONL file, newest last, optionally filtered."""
+    if not os.path.exists(path):
+        return []
+    # Read extra lines when filtering so a filter still finds up to `limit` matches
+    text, _, _ = tail_lines(path, limit * (10 if event or group_url else 1))
+    items = []
+    for line in text.splitlines():
+        try:
+            item = json.loads(line)
+        except ValueError:
+            continue
+        if event and item.get('event') != event:
+            continue
+        if group_url and item.get('group_url') != group_url:
+            continue
+        items.append(item)
+    return items[-limit:]
@@ -73,7 +73,6 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import undetected_chromedriver as uc
-import re
 
 # Suppress OSError during Chrome.__del__ on Windows
 try:
@@ -91,96 +90,215 @@ except Exception:
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 
+from image_inventory import get_inventory
+from log_archive import setup_logging
+from metrics import span
+import driver_profiler
+import pending_rules
+from pending_rules import probe_page
+import group_cache
+from group_cache import ttls_from_config
+import run_journal
+from run_journal import RunJournal
+from run_history import get_history
+import threading
+from supervisor import BotStopped, RUNNING, RESTING, PAUSED, CLEANING
+from driver_cache import DriverCache, StartupTimer
+from memory_watchdog import watchdog
+from health_monitor import monitor as health_monitor
+import events
+from config_store import get_store
+from image_cache import get_image_cache
+from artifact_store import get_artifact_store
+from selector_registry import get_selector_registry
+from cleanup_job import get_cleanup_job
+
 # Get the directory of the current script
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+from paths import BASE_DIR
+
+# Logging setup (size-based rotation into gzip archives under logs/)
+setup_logging(os.path.join(BASE_DIR, 'facebook_bot.log'))
+# Structured JSONL events next to it, written from a queue listener thread
+events.setup_events(os.path.join(BASE_DIR, 'events.jsonl'))
+
+# Browser version + patched chromedriver, reused across restarts
+DRIVER_CACHE = DriverCache(os.path.join(BASE_DIR, '.driver_cache'))
+image_cache = get_image_cache(os.path.join(BASE_DIR, '.image_cache'))
+artifacts = get_artifact_store(os.path.join(BASE_DIR, 'artifacts'))
+
+class StoppableWait(WebDriverWait):
+    """WebDriverWait that gives up (raising BotStopped) at the next poll once stop is requested."""
+
+    def __init__(self, driver, timeout, stop_event, **kwargs):
+        super().__init__(driver, timeout, **kwargs)
+        self.stop_event = stop_event
+
+    def _check(self, method):
+        def condition(driver):
+            if self.stop_event.is_set():
+                raise BotStopped()
+            return method(driver)
+        return condition
+
+    def until(self, method, message=""):
+        return super().until(self._check(method), message)
+
+    def until_not(self, method, message=""):
+        return super().until_not(self._check(method), message)
 
-# Logging setup
-logging.basicConfig(
-    filename=os.path.join(BASE_DIR, 'facebook_bot.log'),
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 
 class FacebookBot:
-    def __init__(self, config_path=None):
+    def __init__(self, config_path=None, stop_event=None, on_state=None, resume_event=None):
+        # Set by the supervisor (or is_active = False) to stop sleeps and waits promptly
+        self.stop_event = stop_event or threading.Event()
+        self.on_state = on_state
+        # Cleared by the supervisor to pause between groups
+        if resume_event is None:
+            resume_event = threading.Event()
+            resume_event.set()
+        self.resume_event = resume_event
         if config_path is None:
             config_path = os.path.join(BASE_DIR, 'config.json')
         self.load_config(config_path)
         self.setup_driver()
+        self.journal = RunJournal(
+            os.path.join(BASE_DIR, 'run_journal.jsonl'),
+            legacy_state_path=os.path.join(BASE_DIR, 'bot_state.json'),
+        )
+        self.history = get_history(os.path.join(BASE_DIR, 'run_history.db'))
         self.current_post_index = self.load_state()
-        self.is_active = True
+        self.group_cache = group_cache.get_cache(os.path.join(BASE_DIR, 'group_status.json'))
+        self.selectors = get_selector_registry(os.path.join(BASE_DIR, 'selector_stats.json'))
+        self.cleanup_job = get_cleanup_job(os.path.join(BASE_DIR, 'cleanup_progress.json'))
+
+    @property
+    def is_active(self):
+        return not self.stop_event.is_set()
+
+    @is_active.setter
+    def is_active(self, value):
+        if value:
+            self.stop_event.clear()
+        else:
+            self.stop_event.set()
+
+    def set_state(self, state):
+        self.state = state
+        if self.on_state:
+            self.on_state(state)
 
     def load_config(self, config_path=None):
         if config_path is None:
             config_path = os.path.join(BASE_DIR, 'config.json')
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                self.config = json.load(f)
-            
-            # Auto-load images from 'pic' folder if empty
-            if not self.config.get('image_paths'):
-                pic_dir = os.path.join(BASE_DIR, 'pic')
-                if os.path.exists(pic_dir):
-                    valid_exts = ('.jpg', '.jpeg', '.png', '.gif')
-                    self.config['image_paths'] = [
-                        os.path.join(pic_dir, f) for f in os.listdir(pic_dir)
-                        if f.lower().endswith(valid_exts)
-                    ]
-                    logging.info(f"Loaded {len(self.config['image_paths'])} images from config and 'pic' folder.")
+            # Shared, cached store: the file is only re-read when it changes on disk
+            self.config_store = get_store(config_path)
+            self.config = self.config_store.get()
+            self.auto_images = False
+            self.config_version = self.config_store.version
+            self.refresh_image_paths()
             logging.info("Config loaded successfully.")
         except Exception as e:
             logging.error(f"Failed to load config: {e}")
             raise
 
-    def load_state(self):
-        state_file = os.path.join(BASE_DIR, 'bot_state.json')
-        if os.path.exists(state_file):
-            try:
-                with open(state_file, 'r', encoding='utf-8') as f:
-                    return json.load(f).get('current_index', 0)
-            except:
-                pass
-        return 0
+    def refresh_image_paths(self):
+        # Auto-load images from 'pic' folder if empty
+        if self.config.get('image_paths') and not getattr(self, 'auto_images', False):
+            return
+        pic_dir = os.path.join(BASE_DIR, 'pic')
+        if os.path.exists(pic_dir):
+            paths = get_inventory(pic_dir).paths()
+            if paths != self.config.get('image_paths'):
+                self.config['image_paths'] = paths
+                self.auto_images = True
+                logging.info(f"Loaded {len(self.config['image_paths'])} images from config and 'pic' folder.")
+
+    def reload_config_if_changed(self):
+        """Apply config changes (saved from the API or edited on disk) without re-reading an unchanged file."""
+        self.config_store.refresh()
+        if self.config_store.version != self.config_version:
+            logging.info("Config changed, reloading.")
+            self.load_config(self.config_store.path)
+        else:
+            self.refresh_image_paths()
 
-    def save_state(self, index):
-        state_file = os.path.join(BASE_DIR, 'bot_state.json')
+    def get_group_urls(self):
+        groups = self.config.get('group_urls', [])
+        if not groups and self.config.get('group_url'):
+            groups = [self.config['group_url']]
+        return groups
+
+    def load_state(self, groups=None):
+        """Resume index for `groups`, recovered from the tail of the run journal."""
+        if groups is None:
+            groups = self.get_group_urls()
         try:
-            with open(state_file, 'w', encoding='utf-8') as f:
-                json.dump({'current_index': index}, f)
+            return self.journal.resume_index(groups)
         except Exception as e:
-            logging.warning(f"Failed to save state: {e}")
+            logging.warning(f"Failed to read run journal, starting from the first group: {e}")
+            return 0
 
-    def get_chrome_version(self):
+    def save_state(self, url, outcome, duration=None, next_url=None, **extra):
+        """Journal the attempt (resume point) and add it to the queryable run history.
+        Returns the history row id, or None if it could not be written."""
+        events.emit('group_attempt', group_url=url, phase='group', outcome=outcome,
+                    duration=duration, error=extra.get('error'))
         try:
-            import subprocess
-            import platform
-            if platform.system() == "Windows":
-                cmd = ['reg', 'query', 'HKEY_CURRENT_USER\\Software\\Google\\Chrome\\BLBeacon', '/v', 'version']
-                output = subprocess.check_output(cmd, stderr=subprocess.DEVNULL).decode('utf-8')
-                version = int(output.strip().split()[-1].split('.')[0])
-                return version
-            else:
-                cmd = ['/Applications/Google Chrome.app/Contents/MacOS/Google Chrome', '--version']
-                output = subprocess.check_output(cmd).decode('utf-8')
-                # Extract major version, e.g., "Google Chrome 145.0.7632.117" -> 145
-                version = int(output.split()[-1].split('.')[0])
-                return version
+            self.journal.record_group(url, outcome, duration, next_url, **extra)
         except Exception as e:
-            logging.warning(f"Could not detect Chrome version: {e}")
+            logging.warning(f"Failed to save state: {e}")
+        try:
+            return self.history.record_attempt(url, outcome, duration=duration, error=extra.get('error'))
+        except Exception as e:
+            logging.warning(f"Failed to record run history: {e}")
             return None
 
-    def setup_driver(self):
+    def get_chrome_version(self):
+        """Major version of the installed Chrome, cached per browser binary."""
+        return DRIVER_CACHE.resolve().get('version_main')
+
+    def chrome_options(self):
+        # A fresh object per launch: undetected_chromedriver refuses to reuse options
         options = uc.ChromeOptions()
         options.add_argument("--disable-notifications")
-        
-        chrome_version = self.get_chrome_version()
+        return options
+
+    def setup_driver(self):
+        timer = StartupTimer()
+        resolution = DRIVER_CACHE.resolve()
+        timer.mark('detect')
+        chrome_version = resolution.get('version_main')
         if chrome_version:
-            logging.info(f"Detected Chrome version: {chrome_version}")
+            logging.info(f"Detected Chrome version: {chrome_version}{' (cached)' if resolution.get('cached') else ''}")
         
+        # Pass version_main to ensure the driver matches the browser
+        kwargs = dict(use_subprocess=True, version_main=chrome_version)
+        if resolution.get('binary'):
+            kwargs['browser_executable_path'] = resolution['binary']
+        warm = bool(resolution.get('driver_path'))
         try:
-            # Pass version_main to ensure the driver matches the browser
-            self.driver = uc.Chrome(options=options, use_subprocess=True, version_main=chrome_version)
+            self.driver = None
+            if warm:
+                # Already patched for this browser version: skips download and patching
+                try:
+                    self.driver = uc.Chrome(options=self.chrome_options(), driver_executable_path=resolution['driver_path'], **kwargs)
+                except Exception as e:
+                    logging.warning(f"Cached chromedriver failed to start ({e}); resolving a fresh one.")
+                    warm = False
+            if self.driver is None:
+                self.driver = uc.Chrome(options=self.chrome_options(), **kwargs)
+                patcher = getattr(self.driver, 'patcher', None)
+                DRIVER_CACHE.store_driver(resolution, getattr(patcher, 'executable_path', None))
+            timer.mark('launch')
+            if driver_profiler.is_enabled(self.config):
+                driver_profiler.profiler.attach(self.driver)
             self.driver.maximize_window()
+            timer.mark('maximize')
+            watchdog.configure(self.config)
+            watchdog.watch(self.driver)
+            health_monitor.watch(self.driver)
+            self.startup_report = timer.finish(warm=warm, version=resolution.get('version'), binary=resolution.get('binary'))
             logging.info("Driver initialized successfully.")
         except Exception as e:
             logging.error(f"Failed to initialize driver: {e}")
@@ -191,7 +309,118 @@ class FacebookBot:
             min_time = self.config.get('min_delay', 1)
         if max_time is None:
             max_time = self.config.get('max_delay', 3)
-        time.sleep(random.uniform(min_time, max_time))
+        self.sleep(random.uniform(min_time, max_time))
+
+    def sleep(self, seconds):
+        """Interruptible sleep: raises BotStopped as soon as a stop is requested."""
+        if self.stop_event.wait(seconds):
+            raise BotStopped()
+
+    def wait(self, timeout):
+        return StoppableWait(self.driver, timeout, self.stop_event)
+
+    def try_selectors(self, chain, selectors, attempt):
+        """Call attempt(selector) for each selector of a fallback chain, most recently
+        successful first, until one doesn't raise. Returns (selector, result) or (None, None)."""
+        for selector in self.selectors.order(chain, selectors):
+            try:
+                result = attempt(selector)
+            except Exception:
+                self.selectors.record(chain, selector, False)
+                continue
+            self.selectors.record(chain, selector, True)
+            return selector, result
+        return None, None
+
+    def recycle_driver(self, reason):
+        """Restart Chrome (memory budget, or a dead session found by the health probe),
+        keeping the login via cookies. Called only from the bot thread at a safe point;
+        the group index lives in the journal."""
+        logging.info(f"Recycling browser: {reason}")
+        self.save_cookies_to_file()
+        watchdog.stop()
+        health_monitor.stop()
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.setup_driver()
+        self.login(is_gui=getattr(self, 'is_gui', True))
+        if self.config.get('page_url'):
+            self.switch_to_page()
+
+    def maybe_recycle_driver(self):
+        # A dead session is replaced before the next group instead of failing it
+        reason = health_monitor.should_restart()
+        if reason:
+            with span('restart_driver'):
+                self.recycle_driver(reason)
+            health_monitor.restarted(reason)
+            return
+        reason = watchdog.should_recycle()
+        if reason:
+            with span('recycle_driver'):
+                self.recycle_driver(reason)
+            watchdog.recycled(reason)
+
+    def wait_if_paused(self, next_url):
+        """Safe point between groups: if a pause was requested, checkpoint and hold here
+        (browser and login kept alive) until resumed or stopped."""
+        if self.resume_event.is_set():
+            return
+        self.journal.checkpoint_pause(next_url)
+        self.set_state(PAUSED)
+        logging.info(f"Paused. Will continue with {next_url} when resumed.")
+        while not self.resume_event.wait(0.2):
+            if self.stop_event.is_set():
+                raise BotStopped()
+            self.run_cleanup_if_requested()
+        if self.stop_event.is_set():
+            raise BotStopped()
+        logging.info("Resumed.")
+        self.set_state(RUNNING)
+
+    def run_cleanup_if_requested(self):
+        """Idle point (resting or paused): run a cleanup job queued from the API on this session."""
+        if not self.cleanup_job.requested.is_set():
+            return
+        previous = getattr(self, 'state', None)
+        self.set_state(CLEANING)
+        try:
+            self.cleanup_job.run(self)
+        finally:
+            if previous:
+                self.set_state(previous)
+
+    def rest(self, seconds):
+        """Interruptible rest between cycles that still serves queued cleanup jobs."""
+        deadline = time.time() + seconds
+        while True:
+            self.run_cleanup_if_requested()
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return
+            self.sleep(min(remaining, 1.0))
+
+    def run_cleanup_only(self, is_gui=False):
+        """Log in, run the queued cleanup job, and quit (used when the poster isn't running)."""
+        try:
+            with span('login'):
+                self.login(is_gui=is_gui)
+            if self.config.get('page_url'):
+                with span('switch_to_page'):
+                    self.switch_to_page()
+            self.set_state(CLEANING)
+            self.cleanup_job.run(self)
+        except BotStopped:
+            logging.info("Stop requested, cleanup stopped.")
+        finally:
+            watchdog.stop()
+            health_monitor.stop()
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
 
     def human_typing(self, element, text):
         text = str(text)
@@ -264,7 +493,7 @@ class FacebookBot:
                 logging.info(f"Accepted cookies using: {selector}")
                 self.random_sleep(1, 2)
                 break
-            except:
+            except Exception:
                 continue
 
         # Try to load cookies from file
@@ -289,7 +518,7 @@ class FacebookBot:
                     if self.driver.find_elements(By.CSS_SELECTOR, indicator):
                         logging.info(f"Already logged in (detected via {indicator}).")
                         return
-                except:
+                except Exception:
                     continue
 
             # If not logged in, look for email/pass fields
@@ -300,20 +529,12 @@ class FacebookBot:
                  (By.CSS_SELECTOR, "input[placeholder*='Email']")
             ]
             
-            email_input = None
-            for by, selector in email_selectors:
-                try:
-                    email_input = WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located((by, selector))
-                    )
-                    if email_input:
-                        break
-                except:
-                    continue
+            _, email_input = self.try_selectors('login_email', email_selectors,
+                lambda sel: self.wait(5).until(EC.presence_of_element_located(tuple(sel))))
             
             if not email_input:
                 logging.error("Could not find email input field.")
-                self.driver.save_screenshot(os.path.join(BASE_DIR, "login_error_email.png"))
+                artifacts.capture(self.driver, 'login_email')
                 raise Exception("Email field not found")
 
             self.human_typing(email_input, self.config['email'])
@@ -327,14 +548,8 @@ class FacebookBot:
                 (By.CSS_SELECTOR, "input[name='pass']")
             ]
             
-            pass_input = None
-            for by, selector in pass_selectors:
-                try:
-                    pass_input = self.driver.find_element(by, selector)
-                    if pass_input:
-                        break
-                except:
-                    continue
+            _, pass_input = self.try_selectors('login_password', pass_selectors,
+                lambda sel: self.driver.find_element(*sel))
             
             if not pass_input:
                 logging.error("Could not find password field.")
@@ -352,19 +567,17 @@ class FacebookBot:
                 (By.XPATH, "//button[contains(text(), 'Đăng nhập')]")
             ]
             
-            login_clicked = False
-            for by, selector in login_selectors:
-                try:
-                    btn = self.driver.find_element(by, selector)
-                    if btn.is_displayed():
-                        btn.click()
-                        login_clicked = True
-                        logging.info(f"Clicked login button using {selector}")
-                        break
-                except:
-                    continue
-            
-            if not login_clicked:
+            def click_login(sel):
+                btn = self.driver.find_element(*sel)
+                if not btn.is_displayed():
+                    raise Exception("Login button not displayed")
+                btn.click()
+                return True
+
+            selector, login_clicked = self.try_selectors('login_button', login_selectors, click_login)
+            if login_clicked:
+                logging.info(f"Clicked login button using {selector[1]}")
+            else:
                 logging.warning("Login button not found or not clickable, trying to press ENTER...")
                 pass_input.send_keys(Keys.ENTER)
             
@@ -378,7 +591,7 @@ class FacebookBot:
                 if is_gui:
                     logging.info("GUI Mode: Waiting 60s for manual verification...")
                     # In GUI mode, we just wait a long time for the user to do it
-                    time.sleep(60)
+                    self.sleep(60)
                 else:
                     print("\n" + "!" * 60)
                     print("PHÁT HIỆN XÁC THỰC 2 LỚP (2FA) HOẶC KIỂM TRA BẢO MẬT.")
@@ -393,13 +606,15 @@ class FacebookBot:
 
         except Exception as e:
             logging.error(f"Error during login: {e}")
-            self.driver.save_screenshot(os.path.join(BASE_DIR, "login_error.png"))
+            artifacts.capture(self.driver, 'login')
             raise
 
 
     def navigate_to_pending_via_button(self, group_url):
         """Navigate to pending content by going to group page first, then clicking 'Quản lý bài viết'.
-        Returns True if successfully navigated to pending content page, False otherwise."""
+        Returns True if successfully navigated to pending content page, False otherwise.
+        The last in-page probe is kept in self.last_pending_probe so callers can reuse it."""
+        self.last_pending_probe = None
         # Step 1: Navigate to the group page
         self.driver.get(group_url)
         self.random_sleep(3, 5)
@@ -414,32 +629,35 @@ class FacebookBot:
             "//div[@role='button' and contains(., 'Quản lý bài viết')]",
         ]
         
-        for selector in manage_selectors:
+        def click_manage(sel):
+            btn = self.wait(3).until(
+                EC.element_to_be_clickable((By.XPATH, sel))
+            )
+            btn.click()
+            return True
+
+        _, clicked = self.try_selectors('manage_posts', manage_selectors, click_manage)
+        if clicked:
+            self.random_sleep(3, 5)
+            
+            # Sau khi bấm, nếu gặp lỗi "Trang này hiện không hiển thị" thì bấm Tải lại
             try:
-                btn = WebDriverWait(self.driver, 3).until(
-                    EC.element_to_be_clickable((By.XPATH, selector))
-                )
-                btn.click()
-                self.random_sleep(3, 5)
-                
-                # Sau khi bấm, nếu gặp lỗi "Trang này hiện không hiển thị" thì bấm Tải lại
-                try:
-                    body_now = self.driver.find_element(By.TAG_NAME, "body").text.lower()
-                    if "trang này hiện không hiển thị" in body_now or "trang này không hiển thị" in body_now:
-                        reload_btn_xpath = "//div[@role='button' and contains(., 'Tải lại trang')]"
-                        r_btn = WebDriverWait(self.driver, 5).until(
-                            EC.element_to_be_clickable((By.XPATH, reload_btn_xpath))
-                        )
-                        r_btn.click()
-                        logging.info("Gặp trang lỗi kỹ thuật, đã bấm 'Tải lại trang'.")
-                        self.random_sleep(5, 7)
-                except:
-                    pass
+                probe = probe_page(self.driver)
+                self.last_pending_probe = probe
+                if probe.get('reloadable'):
+                    reload_btn_xpath = "//div[@role='button' and contains(., 'Tải lại trang')]"
+                    r_btn = self.wait(5).until(
+                        EC.element_to_be_clickable((By.XPATH, reload_btn_xpath))
+                    )
+                    r_btn.click()
+                    self.last_pending_probe = None
+                    logging.info("Gặp trang lỗi kỹ thuật, đã bấm 'Tải lại trang'.")
+                    self.random_sleep(5, 7)
+            except Exception:
+                pass
 
-                logging.info(f"Clicked 'Quản lý bài viết' button.")
-                return True
-            except:
-                continue
+            logging.info(f"Clicked 'Quản lý bài viết' button.")
+            return True
         
         # Fallback: try direct URL if button not found (some groups may not show it)
         pending_url = group_url.rstrip('/') + "/my_pending_content"
@@ -448,75 +666,77 @@ class FacebookBot:
         self.random_sleep(4, 6)
         
         # Kiểm tra lỗi ở đây nữa nếu đi bằng URL trực tiếp
-        try:
-            body_now = self.driver.find_element(By.TAG_NAME, "body").text.lower()
-            if "trang này hiện không hiển thị" in body_now or "trang này không hiển thị" in body_now:
+        probe = probe_page(self.driver)
+        if probe.get('reloadable'):
+            try:
                 reload_btn_xpath = "//div[@role='button' and contains(., 'Tải lại trang')]"
                 r_btns = self.driver.find_elements(By.XPATH, reload_btn_xpath)
                 if r_btns:
                     r_btns[0].click()
                     logging.info("Gặp trang lỗi kỹ thuật (URL), đã bấm 'Tải lại trang'.")
                     self.random_sleep(5, 7)
-        except:
-            pass
+                    probe = probe_page(self.driver)
+            except Exception:
+                pass
+        self.last_pending_probe = probe
         
         # Check if page loaded correctly (not error page)
-        body_text = self.driver.find_element(By.TAG_NAME, "body").text.lower()
-        if "trang này không hiển thị" in body_text or "this page isn't available" in body_text or "liên kết đã hỏng" in body_text:
+        if probe.get('state') == pending_rules.ERROR:
             logging.warning(f"Pending content page not available for {group_url}. Proceeding to post.")
             return False
         
         return True
 
     def check_pending_posts(self, group_url):
+        self.last_pending_outcome = None
         if not group_url:
             return False
             
         logging.info(f"Checking pending posts for: {group_url}")
+        started = time.time()
+
+        def result(has_pending, outcome, reason=None, error=None):
+            # Kept for the caller's metrics span: errors still return False (post anyway)
+            self.last_pending_outcome = outcome
+            events.emit('pending_check', group_url=group_url, phase='check_pending', outcome=outcome,
+                        duration=time.time() - started, error=error, reason=reason)
+            return has_pending
         
         try:
             # Navigate to pending content via group page button
             if not self.navigate_to_pending_via_button(group_url):
-                return False
+                return result(False, 'unavailable')
+            
+            # One in-page probe classifies the page (reused from navigation when still valid)
+            probe = getattr(self, 'last_pending_probe', None) or probe_page(self.driver)
             
             # Verify we didn't get redirected to the main page
-            current = self.driver.current_url
+            current = probe.get('url', '')
             if "my_pending_content" not in current and "pending" not in current:
                 logging.info("Not on pending content page. Proceeding to post.")
-                return False
-            
-            # Detect by checking text content
-            body_text = self.driver.find_element(By.TAG_NAME, "body").text.lower()
+                return result(False, 'redirected')
             
-            # 1. Check if explicit "empty" message is displayed
-            if "không có bài" in body_text or "không có bài viết nào để hiển thị" in body_text or "nothing to show here" in body_text or "no posts to show" in body_text or "no pending posts" in body_text:
+            state = probe.get('state')
+            reason = probe.get('reason')
+            if state == pending_rules.EMPTY:
                 logging.info("Explicit 'no pending posts' message found. Proceeding to post.")
-                return False
-                
-            # 2. Check for actual post elements (articles)
-            articles = self.driver.find_elements(By.CSS_SELECTOR, "div[role='article']")
-            if len(articles) > 0:
-                logging.info(f"Found {len(articles)} pending post articles. Skipping group.")
-                return True
-                
-            # 3. Check if the header shows a count like "đang chờ · 2" using regex
-            if re.search(r'(đang chờ|pending( posts)?)\s*\n*\s*·\s*\d+', body_text):
-                logging.info("Detected pending posts by header count regex. Skipping group.")
-                return True
-                
-            # 4. Fallback check for action buttons typical of pending posts
-            if ("chỉnh sửa" in body_text and "xóa" in body_text) or ("edit" in body_text and "delete" in body_text):
-                if "đang chờ" in body_text or "pending" in body_text:
+                return result(False, 'clear', reason)
+            if state == pending_rules.HAS_PENDING:
+                if reason == 'articles':
+                    logging.info(f"Found {probe.get('articles')} pending post articles. Skipping group.")
+                elif reason == 'count_header':
+                    logging.info("Detected pending posts by header count regex. Skipping group.")
+                else:
                     logging.info("Detected pending post action buttons (Edit/Delete). Skipping group.")
-                    return True
+                return result(True, 'pending', reason)
                     
             # If none of the above, default to safe assumption: no pending
             logging.info("No definitive pending posts found. Proceeding to post.")
-            return False
+            return result(False, 'unknown', reason)
             
         except Exception as e:
             logging.error(f"Error checking pending posts: {e}")
-            return False
+            return result(False, 'error', error=e)
 
     def navigate_to_group(self, group_url=None):
         if not group_url:
@@ -544,8 +764,9 @@ class FacebookBot:
             logging.error(f"Navigation failed to {group_url}: {e}")
             return False
 
-    def create_post(self):
+    def create_post(self, group_url=None):
         logging.info("Attempting to create post...")
+        started = time.time()
         try:
             # Click "Write something..." or "Create Post"
             # Attempt multiple selectors
@@ -565,26 +786,23 @@ class FacebookBot:
                  "//div[@aria-label='Bạn đang nghĩ gì?']"
             ]
             
-            post_box_opened = False
-            for selector in create_post_selectors:
-                try:
-                    # Short wait for each to speed up if not found
-                    element = WebDriverWait(self.driver, 3).until(
-                        EC.element_to_be_clickable((By.XPATH, selector))
-                    )
-                    element.click()
-                    post_box_opened = True
-                    logging.info(f"Clicked post button using selector: {selector}")
-                    break
-                except:
-                    continue
-            
-            if not post_box_opened:
+            def click_create(sel):
+                # Short wait for each to speed up if not found
+                element = self.wait(3).until(
+                    EC.element_to_be_clickable((By.XPATH, sel))
+                )
+                element.click()
+                return True
+
+            selector, post_box_opened = self.try_selectors('create_post', create_post_selectors, click_create)
+            if post_box_opened:
+                logging.info(f"Clicked post button using selector: {selector}")
+            else:
                 # Fallback: clicking the generic input area based on class names common in FB
                  try:
                     # Try finding the first div with role=button in the feed area
                     fallback_xpath = "(//div[@role='feed']//div[@role='button'])[1]" 
-                    element = WebDriverWait(self.driver, 3).until(
+                    element = self.wait(3).until(
                         EC.element_to_be_clickable((By.XPATH, fallback_xpath))
                     )
                     element.click()
@@ -602,7 +820,7 @@ class FacebookBot:
             try:
                 # Tìm element text box chính (thường là cái rộng trãi nhất và có aria-label liên quan đến tạo bài)
                 textbox_xpath = "//div[@role='textbox' and @contenteditable='true']"
-                textboxes = WebDriverWait(self.driver, 10).until(
+                textboxes = self.wait(10).until(
                     EC.presence_of_all_elements_located((By.XPATH, textbox_xpath))
                 )
                 
@@ -612,7 +830,7 @@ class FacebookBot:
                 
                 try:
                     textbox.click()
-                except:
+                except Exception:
                     self.driver.execute_script("arguments[0].focus();", textbox)
                 self.random_sleep(1, 2)
             except Exception as wait_err:
@@ -634,14 +852,16 @@ class FacebookBot:
 
             # Upload Images
             if self.config.get('image_paths'):
-                self.upload_images()
+                with span('upload_images') as s:
+                    if not self.upload_images():
+                        s.fail()
 
             self.random_sleep(2, 4)
             
             # Click Post
             for _ in range(3):
                 try:
-                    post_btn = WebDriverWait(self.driver, 10).until(
+                    post_btn = self.wait(10).until(
                         EC.element_to_be_clickable((By.XPATH, "//div[@aria-label='Đăng' or @aria-label='Post']"))
                     )
                     post_btn.click()
@@ -657,10 +877,14 @@ class FacebookBot:
             self.random_sleep(5, 7)
             # Check for success (e.g., post box closed, "Just now" text appeared, etc.) - simple wait for now
             logging.info("Finished posting.")
+            events.emit('create_post', group_url=group_url, phase='create_post', outcome='posted',
+                        duration=time.time() - started, images=len(self.config.get('image_paths') or []))
 
         except Exception as e:
+            # The screenshot is taken by run(), linked to the failed attempt
             logging.error(f"Error creating post: {e}")
-            self.driver.save_screenshot("post_error.png")
+            events.emit('create_post', group_url=group_url, phase='create_post', outcome='failed',
+                        duration=time.time() - started, error=e)
             raise
 
     def upload_images(self):
@@ -668,15 +892,19 @@ class FacebookBot:
         # Common pattern: find the input type=file
         try:
             # Sometime input file tags are regenerated, we use an explicit wait
-            file_input = WebDriverWait(self.driver, 10).until(
+            file_input = self.wait(10).until(
                 EC.presence_of_element_located((By.XPATH, "//input[@type='file' and @multiple]"))
             )
-            paths = "\n".join([os.path.abspath(p) for p in self.config['image_paths']])
+            # Upload resized copies; the originals stay untouched in pic/
+            image_cache.configure(self.config)
+            paths = "\n".join(image_cache.prepare_all(self.config['image_paths']))
             file_input.send_keys(paths)
             logging.info("Images uploaded.")
             self.random_sleep(4, 6) # Wait for upload preview
+            return True
         except Exception as e:
             logging.error(f"Failed to upload images: {e}")
+            return False
 
     def switch_to_page(self):
         page_url = self.config.get('page_url')
@@ -698,61 +926,85 @@ class FacebookBot:
              # Fallback to menu interactions if needed (omitted for simplicity unless requested)
         ]
 
-        switched = False
-        for selector in switch_selectors:
-            try:
-                btn = WebDriverWait(self.driver, 5).until(
-                    EC.element_to_be_clickable((By.XPATH, selector))
-                )
-                btn.click()
-                switched = True
-                logging.info("Clicked 'Switch now' button.")
-                self.random_sleep(5, 8) # Wait for reload
-                break
-            except:
-                continue
-        
-        if not switched:
+        def click_switch(sel):
+            btn = self.wait(5).until(
+                EC.element_to_be_clickable((By.XPATH, sel))
+            )
+            btn.click()
+            return True
+
+        _, switched = self.try_selectors('switch_to_page', switch_selectors, click_switch)
+        if switched:
+            logging.info("Clicked 'Switch now' button.")
+            self.random_sleep(5, 8) # Wait for reload
+        else:
             logging.warning("Could not find 'Switch now' button. Assuming already on correct profile or button hidden.")
 
     def run(self, is_gui=False, continuous=True):
+        self.is_gui = is_gui
         try:
-            self.login(is_gui=is_gui)
+            with span('login'):
+                self.login(is_gui=is_gui)
             if getattr(self, "is_active", True) and self.config.get('page_url'):
-                self.switch_to_page()
+                with span('switch_to_page'):
+                    self.switch_to_page()
+            self.set_state(RUNNING)
                 
             while getattr(self, "is_active", True):
-                # Reload config dynamicly for each cycle
+                # Pick up config changes for each cycle
                 try:
-                    self.load_config()
+                    self.reload_config_if_changed()
+                    watchdog.configure(self.config)
                 except Exception as e:
                     logging.warning(f"Could not reload config: {e}")
                     
-                groups = self.config.get('group_urls', [])
-                if not groups and self.config.get('group_url'):
-                    groups = [self.config['group_url']]
+                groups = self.get_group_urls()
 
                 if not groups:
                     logging.warning("No group URLs provided in config.")
                     break
 
-                start_idx = self.load_state()
+                start_idx = self.load_state(groups)
                 if start_idx >= len(groups):
                     start_idx = 0
                     
                 logging.info(f"Starting post cycle for {len(groups)} groups (Resuming from index {start_idx}).")
+                cycle_started = time.time()
+                events.emit('cycle_start', phase='cycle', groups=len(groups), start_index=start_idx)
                 
                 for i, url in enumerate(groups[start_idx:], start=start_idx):
                     if not getattr(self, "is_active", True):
                         break
+                    self.wait_if_paused(url)
+                    self.maybe_recycle_driver()
                         
+                    started = time.time()
+                    next_url = groups[i + 1] if i + 1 < len(groups) else None
                     try:
+                        # Recently seen as pending: skip without loading any page
+                        cached = self.group_cache.lookup(url, ttls_from_config(self.config))
+                        if cached:
+                            logging.info(f"Skipped {url}: cached status '{cached['status']}' ({int(cached['age'])}s old, TTL {cached['ttl']}s).")
+                            self.save_state(url, run_journal.SKIPPED_CACHED, time.time() - started, next_url)
+                            continue
+
                         # Check for pending posts before anything else
-                        has_pending = self.check_pending_posts(url)
+                        with span('check_pending_posts') as s:
+                            has_pending = self.check_pending_posts(url)
+                            if self.last_pending_outcome == 'error':
+                                s.fail()
+                        self.group_cache.record(url, group_cache.PENDING if has_pending else group_cache.CLEAR)
                         
                         if not has_pending:
-                            if self.navigate_to_group(url):
-                                self.create_post()
+                            with span('navigate_to_group') as s:
+                                navigated = self.navigate_to_group(url)
+                                if not navigated:
+                                    s.fail()
+                            if navigated:
+                                with span('create_post'):
+                                    self.create_post(url)
+                                self.group_cache.record(url, group_cache.POSTED)
+                                self.save_state(url, run_journal.POSTED, time.time() - started, next_url)
                                 
                                 # Only wait if not the last group in this cycle OR if continuous
                                 if i < len(groups) - 1 or continuous:
@@ -762,18 +1014,16 @@ class FacebookBot:
                                     self.random_sleep(delay_min, delay_max)
                             else:
                                 logging.warning(f"Skipping post for {url} due to navigation failure.")
+                                self.save_state(url, run_journal.NAV_FAILED, time.time() - started, next_url)
                         else:
                             logging.info(f"Skipped {url} due to existing pending post.")
-                            
-                        # Save progression index reliably
-                        self.save_state(i + 1)
+                            self.save_state(url, run_journal.SKIPPED_PENDING, time.time() - started, next_url)
                             
                     except Exception as group_err:
                         logging.error(f"Failed to post to {url}: {group_err}")
-                        try:
-                            self.driver.save_screenshot(os.path.join(BASE_DIR, f"post_error_{i}.png"))
-                        except:
-                            pass
+                        history_id = self.save_state(url, run_journal.FAILED, time.time() - started, next_url,
+                                                     error=type(group_err).__name__)
+                        artifacts.capture(self.driver, 'post', group_url=url, history_id=history_id)
                         
                         # Force raise if driver is unrecoverably dead so app.py restarts bot
                         err_str = str(group_err).lower()
@@ -784,8 +1034,13 @@ class FacebookBot:
                     break
                     
                 # Loop completely finished, reset saved index for the next cycle
-                self.save_state(0)
+                self.journal.complete_cycle()
+                watchdog.cycle_completed()
+                events.emit('cycle_complete', phase='cycle', outcome='complete',
+                            duration=time.time() - cycle_started, groups=len(groups))
                 logging.info("Completed post cycle for all groups.")
+                if getattr(self.driver, '_profiler', None):
+                    self.driver._profiler.end_cycle()
                 
                 if not continuous:
                     break
@@ -796,21 +1051,26 @@ class FacebookBot:
                 rest_time = random.randint(rest_min, rest_max)
                 logging.info(f"== Cycle completed. Resting {rest_time} seconds before the next loop (Browser stays open)... ==")
                 
-                import time
-                start_rest = time.time()
-                while time.time() - start_rest < rest_time:
-                    if not getattr(self, "is_active", True):
-                        break
-                    time.sleep(1)
+                # Cycle boundary: recycle before resting so the memory is released meanwhile
+                self.maybe_recycle_driver()
+                self.set_state(RESTING)
+                self.rest(rest_time)
+                self.set_state(RUNNING)
             
+        except BotStopped:
+            logging.info("Stop requested, bot stopped.")
+            events.emit('bot_stopped', outcome='stopped')
         except Exception as e:
             logging.error(f"Bot execution failed: {e}")
+            events.emit('bot_crashed', outcome='crashed', error=e)
             raise
         finally:
             logging.info("Closing driver...")
+            watchdog.stop()
+            health_monitor.stop()
             try:
                 self.driver.quit()
-            except:
+            except Exception:
                 pass
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+import os
+import json
+import time
+import logging
+import threading
+
+from storage import PerPath, atomic_write_json
+
+PENDING = "pending"
+POSTED = "posted"
+CLEAR = "clear"
+
+# Statuses that let the bot skip a group without loading any page
+DEFAULT_TTLS = {
+    PENDING: 1800,
+    POSTED: 0,
+    CLEAR: 0,
+}
+
+
+class GroupStatusCache:
+    """Per-group pending status with timestamps, persisted to a JSON file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = {}
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "invalidations": 0}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except Exception as e:
+            logging.warning(f"Could not read group status cache, starting empty: {e}")
+            self.entries = {}
+
+    def _save(self):
+        try:
+            atomic_write_json(self.path, self.entries)
+        except Exception as e:
+            logging.warning(f"Failed to save group status cache: {e}")
+
+    def lookup(self, url, ttls=None):
+        """Return the cached entry if it is still fresh enough to skip the group, else None."""
+        ttls = ttls or DEFAULT_TTLS
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            ttl = ttls.get(entry["status"], 0)
+            age = time.time() - entry["checked_at"]
+            if ttl <= 0 or age >= ttl:
+                self.stats["misses"] += 1
+                if ttl > 0:
+                    self.stats["expired"] += 1
+                return None
+            self.stats["hits"] += 1
+            return dict(entry, age=age, ttl=ttl)
+
+    def record(self, url, status):
+        with self._lock:
+            self.entries[url] = {"status": status, "checked_at": time.time()}
+            self._save()
+
+    def invalidate(self, url=None):
+        """Drop one group's entry (or every entry when url is None). Returns how many were removed."""
+        with self._lock:
+            if url is None:
+                removed = len(self.entries)
+                self.entries = {}
+            else:
+                removed = 1 if self.entries.pop(url, None) is not None else 0
+            self.stats["invalidations"] += removed
+            self._save()
+            return removed
+
+    def summary(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "stats": dict(self.stats, hit_rate=round(self.stats["hits"] / lookups, 3) if lookups else None),
+                "entries": {url: dict(e) for url, e in self.entries.items()},
+            }
+
+
+def ttls_from_config(config):
+    return {
+        PENDING: config.get('pending_cache_ttl', DEFAULT_TTLS[PENDING]),
+        POSTED: config.get('posted_cache_ttl', DEFAULT_TTLS[POSTED]),
+        CLEAR: 0,
+    }
+
+
+_caches = PerPath(GroupStatusCache)
+
+
+def get_cache(path):
+    """Shared cache per file, so the API sees the bot's entries and statistics."""
+    return _caches.get(path)
@@ -0,0 +1,182 @@
+import json
+import time
+import logging
+import threading
+import urllib.error
+import urllib.request
+
+try:
+    import psutil
+except ImportError:
+    # Without psutil only the chromedriver /status and window-handles probes run
+    psutil = None
+
+# Consecutive failed probes before the driver is declared dead (one blip isn't enough)
+FAILURE_THRESHOLD = 2
+
+
+def _executor_url(driver):
+    executor = getattr(driver, 'command_executor', None)
+    config = getattr(executor, '_client_config', None)
+    url = getattr(config, 'remote_server_addr', None) or getattr(executor, '_url', None)
+    return url.rstrip('/') if url else None
+
+
+def _pid_alive(pid):
+    """True/False for the browser process, or None when it can't be checked.
+
+    Not os.kill(pid, 0): on Windows signal 0 is CTRL_C_EVENT, and on POSIX a crashed
+    Chrome that uc started as our child (never reaped) is a zombie that still "exists"."""
+    if psutil is None:
+        return None
+    try:
+        return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return False
+    except psutil.Error:
+        # Exists but not inspectable (access denied)
+        return True
+
+
+class DriverHealthMonitor:
+    """Low-frequency liveness probe of the chromedriver session, on its own thread.
+
+    Each probe talks to chromedriver over separate HTTP requests (never through the
+    bot's driver object): /status for the chromedriver process, then the session's
+    window handles. A session request that merely times out means chromedriver is busy
+    with the bot's own command (e.g. a page load), not that it's dead. The result is
+    cached; the bot asks should_restart() before each group."""
+
+    def __init__(self, interval=30, timeout=5):
+        self.interval = interval
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.url = None
+        self.session_id = None
+        self.browser_pid = None
+        self.result = None
+        self.last_ok = None
+        self.failures = 0
+        self.restarts = 0
+        self.last_restart = None
+
+    def watch(self, driver):
+        """Start (or re-point) probing at a newly created driver."""
+        with self._lock:
+            self.url = _executor_url(driver)
+            self.session_id = getattr(driver, 'session_id', None)
+            # Chrome itself; chromedriver is covered by /status
+            self.browser_pid = getattr(driver, 'browser_pid', None)
+            self.failures = 0
+            self.result = None
+        self._stopped.clear()
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="driver-health", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        with self._lock:
+            self.url = None
+            self.session_id = None
+            self.browser_pid = None
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            self.probe()
+
+    def _get(self, path):
+        with urllib.request.urlopen(self.url + path, timeout=self.timeout) as resp:
+            return json.loads(resp.read().decode('utf-8'))
+
+    def probe(self):
+        with self._lock:
+            url, session_id, browser_pid = self.url, self.session_id, self.browser_pid
+        if not url:
+            return None
+        started = time.perf_counter()
+        result = {"time": time.time(), "ok": False, "chromedriver": None, "browser": None,
+                  "session": None, "error": None}
+        try:
+            status = self._get('/status')
+            result["chromedriver"] = bool(status.get('value', {}).get('ready', True))
+        except Exception as e:
+            result["chromedriver"] = False
+            result["error"] = f"chromedriver unreachable: {e}"
+
+        if browser_pid:
+            result["browser"] = _pid_alive(browser_pid)
+            if result["browser"] is False and not result["error"]:
+                result["error"] = "browser process gone"
+
+        if result["chromedriver"] and session_id:
+            try:
+                value = self._get(f'/session/{session_id}/window/handles').get('value')
+                result["session"] = bool(value)
+                if not value:
+                    result["error"] = "no browser windows"
+            except urllib.error.HTTPError as e:
+                # W3C errors come back as 404/500 with {"value": {"error": "invalid session id"}}
+                try:
+                    detail = json.loads(e.read().decode('utf-8')).get('value', {}).get('error')
+                except Exception:
+                    detail = str(e)
+                result["session"] = False
+                result["error"] = f"session: {detail}"
+            except Exception:
+                # Timed out behind the bot's own command: busy, not dead
+                result["session"] = "busy"
+
+        result["ok"] = result["chromedriver"] is not False and result["browser"] is not False \
+            and result["session"] is not False
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        with self._lock:
+            if url != self.url:
+                # Driver was replaced while probing
+                return result
+            self.result = result
+            if result["ok"]:
+                self.last_ok = result["time"]
+                self.failures = 0
+            else:
+                self.failures += 1
+                logging.warning(f"Driver health probe failed ({self.failures}): {result['error']}")
+        return result
+
+    def should_restart(self):
+        """Reason to restart the driver before the next group, or None."""
+        with self._lock:
+            if self.failures >= FAILURE_THRESHOLD and self.result:
+                return f"driver unhealthy: {self.result['error']}"
+        return None
+
+    def restarted(self, reason):
+        with self._lock:
+            self.restarts += 1
+            self.last_restart = {"time": time.time(), "reason": reason}
+
+    def summary(self):
+        with self._lock:
+            healthy = None if self.result is None else self.failures < FAILURE_THRESHOLD
+            return {
+                "watching": self.url is not None,
+                "healthy": healthy,
+                "interval": self.interval,
+                "last_probe": self.result,
+                "last_ok": self.last_ok,
+                "consecutive_failures": self.failures,
+                "restarts": self.restarts,
+                "last_restart": self.last_restart,
+            }
+
+
+# Shared by the bot thread and the API
+monitor = DriverHealthMonitor()
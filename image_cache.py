@@ -0,0 +1,188 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+
+from storage import PerPath, atomic_write_json
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    # Without Pillow the originals are uploaded unchanged
+    Image = None
+    ImageOps = None
+
+DEFAULT_MAX_SIDE = 2048
+DEFAULT_QUALITY = 85
+
+
+def file_hash(path, block_size=1024 * 1024):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            h.update(block)
+    return h.hexdigest()
+
+
+class ImageCache:
+    """Resized / re-encoded copies of the upload images, keyed by content hash.
+
+    Facebook re-compresses uploads anyway, so sending a 2048px JPEG instead of a
+    multi-MB original only saves upload time. Each image is processed once; the
+    source is re-hashed only when its size/mtime change."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self._lock = threading.Lock()
+        self.max_side = DEFAULT_MAX_SIDE
+        self.quality = DEFAULT_QUALITY
+        self._warned = False
+        self.upload_bytes_saved = 0
+        index = self._load()
+        # sources: path -> {size, mtime_ns, hash}; entries: "<hash>-<side>-<q>" -> {file, original_bytes, cached_bytes}
+        self.sources = index.get('sources', {})
+        self.entries = index.get('entries', {})
+
+    @property
+    def enabled(self):
+        return Image is not None and self.max_side > 0
+
+    def configure(self, config):
+        self.max_side = int(config.get('image_max_side', DEFAULT_MAX_SIDE) or 0)
+        self.quality = int(config.get('image_quality', DEFAULT_QUALITY) or DEFAULT_QUALITY)
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        atomic_write_json(self.index_path, {'sources': self.sources, 'entries': self.entries})
+
+    def _source_hash(self, path, st):
+        known = self.sources.get(path)
+        if known and known['size'] == st.st_size and known['mtime_ns'] == st.st_mtime_ns:
+            return known['hash'], False
+        digest = file_hash(path)
+        self.sources[path] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'hash': digest}
+        return digest, True
+
+    def prepare(self, path):
+        """Path to upload for `path`: the cached copy, or the original when processing
+        is disabled, unavailable or wouldn't make the file smaller."""
+        path = os.path.abspath(path)
+        if not self.enabled:
+            if Image is None and not self._warned:
+                logging.info("Pillow not installed, uploading original images.")
+                self._warned = True
+            return path
+        # Animated GIFs would lose their frames
+        if path.lower().endswith('.gif'):
+            return path
+        try:
+            st = os.stat(path)
+        except OSError:
+            return path
+
+        with self._lock:
+            digest, changed = self._source_hash(path, st)
+            key = f"{digest}-{self.max_side}-{self.quality}"
+            entry = self.entries.get(key)
+            if entry:
+                cached = os.path.join(self.cache_dir, entry['file']) if entry.get('file') else None
+                if cached is None:
+                    if changed:
+                        self._save()
+                    return path
+                if os.path.exists(cached):
+                    if changed:
+                        self._save()
+                    return cached
+            try:
+                entry = self._process(path, key, st.st_size)
+            except Exception as e:
+                logging.warning(f"Could not preprocess image {os.path.basename(path)}: {e}")
+                return path
+            self.entries[key] = entry
+            self._prune()
+            self._save()
+            if not entry['file']:
+                return path
+            logging.info(f"Preprocessed {os.path.basename(path)}: {entry['original_bytes'] // 1024} KB -> {entry['cached_bytes'] // 1024} KB")
+            return os.path.join(self.cache_dir, entry['file'])
+
+    def _process(self, path, key, original_bytes):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with Image.open(path) as img:
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((self.max_side, self.max_side))
+            has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+            if has_alpha:
+                name, fmt, opts = f"{key}.png", 'PNG', {'optimize': True}
+            else:
+                img = img.convert('RGB')
+                name, fmt, opts = f"{key}.jpg", 'JPEG', {'quality': self.quality, 'optimize': True, 'progressive': True}
+            dest = os.path.join(self.cache_dir, name)
+            tmp = dest + '.tmp'
+            img.save(tmp, fmt, **opts)
+        cached_bytes = os.path.getsize(tmp)
+        if cached_bytes >= original_bytes:
+            # Already small enough; remember that so it isn't re-encoded every time
+            os.remove(tmp)
+            return {'file': None, 'original_bytes': original_bytes, 'cached_bytes': original_bytes}
+        os.replace(tmp, dest)
+        return {'file': name, 'original_bytes': original_bytes, 'cached_bytes': cached_bytes}
+
+    def _prune(self):
+        """Drop sources that no longer exist and cached files nothing points at."""
+        self.sources = {p: s for p, s in self.sources.items() if os.path.exists(p)}
+        live = {s['hash'] for s in self.sources.values()}
+        for key in list(self.entries):
+            if key.split('-', 1)[0] in live and key.endswith(f"-{self.max_side}-{self.quality}"):
+                continue
+            entry = self.entries.pop(key)
+            if entry.get('file'):
+                try:
+                    os.remove(os.path.join(self.cache_dir, entry['file']))
+                except OSError:
+                    pass
+
+    def prepare_all(self, paths):
+        prepared = [self.prepare(p) for p in paths]
+        for original, upload in zip(paths, prepared):
+            try:
+                self.upload_bytes_saved += os.path.getsize(original) - os.path.getsize(upload)
+            except OSError:
+                pass
+        return prepared
+
+    def summary(self):
+        with self._lock:
+            entries = list(self.entries.values())
+        original = sum(e['original_bytes'] for e in entries)
+        cached = sum(e['cached_bytes'] for e in entries)
+        return {
+            "enabled": self.enabled,
+            "max_side": self.max_side,
+            "quality": self.quality,
+            "entries": len(entries),
+            "original_bytes": original,
+            "cached_bytes": cached,
+            "bytes_saved": original - cached,
+            "upload_bytes_saved": self.upload_bytes_saved,
+        }
+
+
+_caches = PerPath(ImageCache)
+
+
+def get_image_cache(cache_dir):
+    return _caches.get(cache_dir)
@@ -0,0 +1,73 @@
+import os
+import threading
+
+from storage import PerPath
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.gif')
+
+
+class ImageInventory:
+    """Cached listing of the image folder. The directory is only rescanned when its
+    mtime changes (files added, removed or renamed); otherwise a lookup costs one stat()."""
+
+    def __init__(self, pic_dir, exts=IMAGE_EXTS):
+        self.pic_dir = pic_dir
+        self.exts = exts
+        self._lock = threading.Lock()
+        self._mtime_ns = None
+        self._files = []
+        self.scans = 0
+
+    def refresh(self, force=False):
+        try:
+            dir_mtime = os.stat(self.pic_dir).st_mtime_ns
+        except OSError:
+            dir_mtime = None
+
+        with self._lock:
+            if not force and self.scans and dir_mtime == self._mtime_ns:
+                return False
+            files = []
+            if dir_mtime is not None:
+                with os.scandir(self.pic_dir) as it:
+                    for entry in it:
+                        if not entry.name.lower().endswith(self.exts) or not entry.is_file():
+                            continue
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        files.append({
+                            "name": entry.name,
+                            "path": entry.path,
+                            "size": st.st_size,
+                            "mtime": st.st_mtime,
+                        })
+            files.sort(key=lambda f: f["name"])
+            self._files = files
+            self._mtime_ns = dir_mtime
+            self.scans += 1
+            return True
+
+    def files(self):
+        self.refresh()
+        return list(self._files)
+
+    def paths(self):
+        return [f["path"] for f in self.files()]
+
+    def summary(self):
+        files = self.files()
+        return {
+            "count": len(files),
+            "total_bytes": sum(f["size"] for f in files),
+            "files": [{"name": f["name"], "size": f["size"], "mtime": f["mtime"]} for f in files],
+        }
+
+
+_inventories = PerPath(ImageInventory)
+
+
+def get_inventory(pic_dir):
+    """Shared inventory per folder, so the API and the bot reuse the same cache."""
+    return _inventories.get(pic_dir)
@@ -0,0 +1,355 @@
+"""Streaming analytics over facebook_bot.log and its archives in logs/.
+
+One pass over every log line with bounded memory. Rebuilds per-group attempts and
+outcomes, phase durations, daily totals and cleanup counts from the plain-text
+messages. The result and the read position are saved to log_analytics.json, so a
+later run only parses bytes it hasn't seen yet (archives are parsed once).
+
+    python log_analytics.py              # update and print a summary
+    python log_analytics.py --rebuild    # start over from the oldest archive
+    python log_analytics.py --json       # print the full result as JSON
+"""
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import argparse
+import threading
+
+from paths import BASE_DIR
+from storage import PerPath, atomic_write_json
+from metrics import Histogram
+from log_archive import parse_line_time, load_index, archive_dir_for, pending_rotations, _first_time
+
+STATE_VERSION = 1
+MAX_ERROR_KINDS = 100
+
+# Group outcomes, as logged by FacebookBot.run / create_post
+OUTCOME_PATTERNS = [
+    (re.compile(r"^Finished posting\.$"), "posted", False),
+    (re.compile(r"^Skipped (\S+) due to existing pending post\."), "skipped_pending", True),
+    (re.compile(r"^Skipped (\S+): cached status"), "skipped_cached", True),
+    (re.compile(r"^Skipping post for (\S+) due to navigation failure\."), "nav_failed", True),
+    (re.compile(r"^Failed to post to (\S+?):"), "failed", True),
+]
+GROUP_START = re.compile(r"^Checking pending posts for: (\S+)")
+GROUP_NAVIGATE = re.compile(r"^Navigating to group: (\S+)")
+
+# (start pattern, end patterns, phase)
+PHASES = [
+    (re.compile(r"^Starting login process"), (re.compile(r"^Login process completed"), re.compile(r"^Already logged in")), "login"),
+    (re.compile(r"^Navigating to page to switch profile"), (re.compile(r"^Clicked 'Switch now'"), re.compile(r"^Could not find 'Switch now'")), "switch_to_page"),
+    (GROUP_START, (GROUP_NAVIGATE, re.compile(r"^Skipped \S+ due to existing pending"), re.compile(r"^Error checking pending posts")), "check_pending"),
+    (GROUP_NAVIGATE, (re.compile(r"^Attempting to create post"), re.compile(r"^Skipping post for"), re.compile(r"^Navigation failed")), "navigate_to_group"),
+    (re.compile(r"^Attempting to create post"), (re.compile(r"^Finished posting\."), re.compile(r"^Error creating post")), "create_post"),
+    (re.compile(r"^Starting post cycle"), (re.compile(r"^Completed post cycle"),), "cycle"),
+    (re.compile(r"^==========> Kiểm tra và xoá nhóm"), (re.compile(r"^Hoàn tất nhóm!"),), "cleanup_group"),
+]
+CLEANUP_START = re.compile(r"^==========> Kiểm tra và xoá nhóm: (\S+)")
+CLEANUP_DONE = re.compile(r"^Hoàn tất nhóm! Tổng cộng đã xoá (\d+)")
+_NORMALIZE = [
+    (re.compile(r"https?://\S+"), "<url>"),
+    (re.compile(r"/session/[0-9a-f]+"), "/session/<id>"),
+    (re.compile(r"\d+"), "N"),
+]
+
+
+def _normalize_error(message):
+    for pattern, repl in _NORMALIZE:
+        message = pattern.sub(repl, message)
+    return message[:120]
+
+
+def _split(line):
+    """(ts, level, message) of a record's first line, or None for continuation lines."""
+    ts = parse_line_time(line)
+    if ts is None:
+        return None
+    parts = line.rstrip('\n').split(' - ', 2)
+    if len(parts) < 3:
+        return None
+    return ts, parts[1], parts[2]
+
+
+class LogAnalytics:
+    def __init__(self, log_path, state_path):
+        self.log_path = log_path
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self.state = self._load()
+
+    def _empty(self):
+        return {
+            "version": STATE_VERSION,
+            "archives_done": [],
+            "live": None,
+            "open": {"group": None, "group_start": None, "phases": {}, "cleanup_group": None},
+            "lines": 0,
+            "bytes": 0,
+            "first_ts": None,
+            "last_ts": None,
+            "groups": {},
+            "phases": {},
+            "days": {},
+            "errors": {},
+            "cleanup": {"groups": 0, "deleted": 0},
+        }
+
+    def _load(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get("version") == STATE_VERSION:
+                return state
+        except Exception:
+            pass
+        return self._empty()
+
+    def _save(self):
+        atomic_write_json(self.state_path, self.state, indent=None)
+
+    # --- aggregation -------------------------------------------------------
+
+    def _phase(self, name, duration):
+        data = self.state["phases"].get(name)
+        hist = Histogram()
+        if data:
+            hist.counts, hist.sum, hist.count = data["counts"], data["sum"], data["count"]
+        hist.observe(duration)
+        self.state["phases"][name] = {
+            "counts": hist.counts,
+            "sum": hist.sum,
+            "count": hist.count,
+            "min": min(duration, data["min"]) if data else duration,
+            "max": max(duration, data["max"]) if data else duration,
+        }
+
+    def _outcome(self, ts, url, outcome):
+        st = self.state
+        opened = st["open"]
+        url = url or opened["group"]
+        if not url:
+            return
+        g = st["groups"].setdefault(url, {"attempts": 0, "outcomes": {}, "duration_sum": 0.0,
+                                          "timed": 0, "last_ts": None, "last_outcome": None,
+                                          "last_posted": None})
+        g["attempts"] += 1
+        g["outcomes"][outcome] = g["outcomes"].get(outcome, 0) + 1
+        if opened["group"] == url and opened["group_start"] is not None:
+            g["duration_sum"] += ts - opened["group_start"]
+            g["timed"] += 1
+            self._phase("group_attempt", ts - opened["group_start"])
+        g["last_ts"] = ts
+        g["last_outcome"] = outcome
+        if outcome == "posted":
+            g["last_posted"] = ts
+        day = time.strftime('%Y-%m-%d', time.localtime(ts))
+        counts = st["days"].setdefault(day, {})
+        counts[outcome] = counts.get(outcome, 0) + 1
+        opened["group"] = None
+        opened["group_start"] = None
+
+    def feed(self, line):
+        """Consume one log line (first line of a record; continuation lines are ignored)."""
+        parsed = _split(line)
+        if parsed is None:
+            return
+        ts, level, message = parsed
+        st = self.state
+        opened = st["open"]
+        st["lines"] += 1
+        st["first_ts"] = st["first_ts"] or ts
+        st["last_ts"] = ts
+
+        for start, ends, phase in PHASES:
+            if phase in opened["phases"] and any(e.match(message) for e in ends):
+                self._phase(phase, ts - opened["phases"].pop(phase))
+            if start.match(message):
+                opened["phases"][phase] = ts
+
+        m = GROUP_START.match(message)
+        if m:
+            opened["group"], opened["group_start"] = m.group(1), ts
+        else:
+            m = GROUP_NAVIGATE.match(message)
+            if m and opened["group"] != m.group(1):
+                opened["group"], opened["group_start"] = m.group(1), ts
+
+        for pattern, outcome, has_url in OUTCOME_PATTERNS:
+            m = pattern.match(message)
+            if m:
+                self._outcome(ts, m.group(1) if has_url else None, outcome)
+                break
+
+        m = CLEANUP_START.match(message)
+        if m:
+            opened["cleanup_group"] = m.group(1)
+        m = CLEANUP_DONE.match(message)
+        if m:
+            st["cleanup"]["groups"] += 1
+            st["cleanup"]["deleted"] += int(m.group(1))
+            opened["cleanup_group"] = None
+
+        if level == "ERROR":
+            key = _normalize_error(message)
+            errors = st["errors"]
+            if key in errors or len(errors) < MAX_ERROR_KINDS:
+                errors[key] = errors.get(key, 0) + 1
+
+    # --- sources -----------------------------------------------------------
+
+    def _feed_stream(self, f, skip=0):
+        """Feed complete lines from a binary stream; returns bytes consumed (incl. skip)."""
+        consumed = 0
+        while consumed < skip:
+            chunk = f.read(min(1024 * 1024, skip - consumed))
+            if not chunk:
+                return consumed
+            consumed += len(chunk)
+        for raw in f:
+            if not raw.endswith(b'\n'):
+                # Line still being written: pick it up next time
+                break
+            consumed += len(raw)
+            self.state["bytes"] += len(raw)
+            self.feed(raw.decode('utf-8', 'replace'))
+        return consumed
+
+    def update(self):
+        """Parse everything not seen yet. Returns the summary."""
+        with self._lock:
+            st = self.state
+            live = st["live"]
+            archive_dir = archive_dir_for(self.log_path)
+            for entry in load_index(archive_dir):
+                name = entry["file"]
+                if name in st["archives_done"]:
+                    continue
+                # The live file we were part-way through has been rotated into this archive
+                skip = 0
+                if live and entry.get("start") is not None and live.get("first_ts") is not None \
+                        and abs(entry["start"] - live["first_ts"]) < 0.001:
+                    skip = live["offset"]
+                    st["live"] = live = None
+                try:
+                    with gzip.open(os.path.join(archive_dir, name), 'rb') as f:
+                        self._feed_stream(f, skip)
+                except (OSError, EOFError):
+                    continue
+                st["archives_done"] = (st["archives_done"] + [name])[-500:]
+
+            # While a rotated file is still being compressed, keep the live offset until its
+            # archive is indexed, or its lines would be counted again from the archive
+            if os.path.exists(self.log_path) and not pending_rotations(self.log_path):
+                inode = os.stat(self.log_path).st_ino
+                size = os.path.getsize(self.log_path)
+                first_ts = _first_time(self.log_path)
+                offset = 0
+                if live and live["inode"] == inode and live["first_ts"] == first_ts and live["offset"] <= size:
+                    offset = live["offset"]
+                with open(self.log_path, 'rb') as f:
+                    f.seek(offset)
+                    offset += self._feed_stream(f)
+                st["live"] = {"inode": inode, "offset": offset, "first_ts": first_ts}
+            self._save()
+            return self.summary()
+
+    def rebuild(self):
+        with self._lock:
+            self.state = self._empty()
+        return self.update()
+
+    def summary(self):
+        st = self.state
+        groups = []
+        for url, g in st["groups"].items():
+            groups.append({
+                "group_url": url,
+                "attempts": g["attempts"],
+                "outcomes": g["outcomes"],
+                "avg_duration": round(g["duration_sum"] / g["timed"], 1) if g["timed"] else None,
+                "last_attempt": g["last_ts"],
+                "last_outcome": g["last_outcome"],
+                "last_posted": g["last_posted"],
+            })
+        groups.sort(key=lambda g: -g["attempts"])
+        phases = {}
+        for name, p in st["phases"].items():
+            phases[name] = {
+                "count": p["count"],
+                "avg": round(p["sum"] / p["count"], 2) if p["count"] else None,
+                "min": round(p["min"], 2),
+                "max": round(p["max"], 2),
+                "buckets": Histogram().buckets,
+                "counts": p["counts"],
+            }
+        totals = {}
+        for counts in st["days"].values():
+            for outcome, n in counts.items():
+                totals[outcome] = totals.get(outcome, 0) + n
+        return {
+            "lines": st["lines"],
+            "bytes": st["bytes"],
+            "first_ts": st["first_ts"],
+            "last_ts": st["last_ts"],
+            "outcomes": totals,
+            "groups": groups,
+            "phases": phases,
+            "days": dict(sorted(st["days"].items())),
+            "cleanup": st["cleanup"],
+            "errors": sorted(({"message": k, "count": v} for k, v in st["errors"].items()),
+                             key=lambda e: -e["count"])[:20],
+        }
+
+
+_analytics = PerPath(LogAnalytics)
+
+
+def get_analytics(log_path, state_path=None):
+    if state_path is None:
+        state_path = os.path.join(os.path.dirname(os.path.abspath(log_path)), 'log_analytics.json')
+    return _analytics.get(log_path, state_path)
+
+
+def _fmt_ts(ts):
+    return time.strftime('%Y-%m-%d %H:%M', time.localtime(ts)) if ts else '-'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--log', default=os.path.join(BASE_DIR, 'facebook_bot.log'))
+    parser.add_argument('--rebuild', action='store_true', help='discard saved state and parse everything again')
+    parser.add_argument('--json', action='store_true', help='print the full result as JSON')
+    args = parser.parse_args()
+
+    analytics = get_analytics(args.log)
+    started = time.perf_counter()
+    before = analytics.state["bytes"]
+    result = analytics.rebuild() if args.rebuild else analytics.update()
+    parsed = result["bytes"] - (0 if args.rebuild else before)
+    if args.json:
+        json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+
+    print(f"Parsed {parsed} new bytes in {time.perf_counter() - started:.2f}s "
+          f"({result['lines']} records, {_fmt_ts(result['first_ts'])} .. {_fmt_ts(result['last_ts'])})")
+    print("Outcomes: " + (", ".join(f"{k} {v}" for k, v in sorted(result['outcomes'].items())) or "none"))
+    print(f"Cleanup: {result['cleanup']['deleted']} posts deleted over {result['cleanup']['groups']} group runs")
+    print("\nPhases:")
+    for name, p in sorted(result['phases'].items()):
+        print(f"  {name:<18} n={p['count']:<5} avg {p['avg']:>7}s  min {p['min']:>7}s  max {p['max']:>7}s")
+    print("\nGroups:")
+    for g in result['groups']:
+        outcomes = ", ".join(f"{k} {v}" for k, v in sorted(g['outcomes'].items()))
+        print(f"  {g['attempts']:>4}  {g['group_url']}  [{outcomes}]  last posted {_fmt_ts(g['last_posted'])}")
+    if result['errors']:
+        print("\nMost frequent errors:")
+        for e in result['errors'][:10]:
+            print(f"  {e['count']:>5}  {e['message']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+import os
+import sys
+import gzip
+import glob
+import json
+import time
+import queue
+import shutil
+import logging
+import threading
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from log_tail import tail_lines
+from storage import atomic_write_json
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 50
+INDEX_NAME = 'index.json'
+
+_index_lock = threading.Lock()
+
+
+def parse_line_time(line):
+    """Epoch seconds of a '%(asctime)s - ...' line, or None for continuation lines (tracebacks)."""
+    if len(line) < 23 or line[4] != '-' or line[10] != ' ':
+        return None
+    try:
+        ts = time.mktime(time.strptime(line[:19], '%Y-%m-%d %H:%M:%S'))
+        return ts + int(line[20:23]) / 1000.0
+    except (ValueError, OverflowError):
+        return None
+
+
+def _first_time(path, opener=open, max_lines=50):
+    with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+        for i, line in enumerate(f):
+            ts = parse_line_time(line)
+            if ts is not None or i >= max_lines:
+                return ts
+    return None
+
+
+def _last_time(path):
+    text, _, _ = tail_lines(path, 50)
+    for line in reversed(text.splitlines()):
+        ts = parse_line_time(line)
+        if ts is not None:
+            return ts
+    return None
+
+
+def archive_dir_for(log_path):
+    return os.path.join(os.path.dirname(os.path.abspath(log_path)), 'logs')
+
+
+def pending_rotations(log_path):
+    """Rotated-out logs still waiting to be compressed, oldest first."""
+    return sorted(glob.glob(glob.escape(os.path.abspath(log_path)) + '.rotating*'))
+
+
+def load_index(archive_dir):
+    path = os.path.join(archive_dir, INDEX_NAME)
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return []
+
+
+def _save_index(archive_dir, entries):
+    atomic_write_json(os.path.join(archive_dir, INDEX_NAME), entries)
+
+
+class ArchivingFileHandler(RotatingFileHandler):
+    """Size-based rotation that gzips each full log into logs/ and records the archive's
+    time range in logs/index.json, so time-window queries only open matching archives.
+
+    The live file is renamed before compression, so tail readers see a new inode.
+    Compression runs on a background thread: rollover happens inside emit() on whichever
+    thread logs (usually the bot's), which only pays for the rename."""
+
+    def __init__(self, filename, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT, encoding='utf-8'):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding)
+        self.archive_dir = archive_dir_for(filename)
+        self._pending = queue.SimpleQueue()
+        self._worker = None
+        # Rotated files a previous run didn't get to compress
+        for path in pending_rotations(self.baseFilename):
+            self._submit(path)
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        # Unique name: a quick second rollover mustn't overwrite one still being compressed
+        rotating = f"{self.baseFilename}.rotating-{time.time_ns()}"
+        try:
+            os.replace(self.baseFilename, rotating)
+        except OSError:
+            rotating = None
+        if not self.delay:
+            self.stream = self._open()
+        if rotating:
+            self._submit(rotating)
+
+    def _submit(self, path):
+        self._pending.put(path)
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._compress_loop, name="log-archiver", daemon=True)
+            self._worker.start()
+
+    def _compress_loop(self):
+        while True:
+            path = self._pending.get()
+            if path is None:
+                return
+            try:
+                self._archive(path)
+            except Exception as e:
+                sys.stderr.write(f"Log archiving failed: {e}\n")
+
+    def close(self):
+        # Finish queued compression so a clean exit leaves no rotated file behind
+        worker = self._worker
+        if worker is not None and worker.is_alive():
+            self._pending.put(None)
+            worker.join(timeout=30)
+        super().close()
+
+    def _archive(self, path):
+        os.makedirs(self.archive_dir, exist_ok=True)
+        start = _first_time(path)
+        end = _last_time(path)
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(end or time.time()))
+        base = f"{os.path.basename(self.baseFilename)}.{stamp}"
+        name = base + '.gz'
+        n = 1
+        while os.path.exists(os.path.join(self.archive_dir, name)):
+            name = f"{base}-{n}.gz"
+            n += 1
+        dest = os.path.join(self.archive_dir, name)
+        raw_bytes = os.path.getsize(path)
+        with _index_lock:
+            if any(e.get('start') == start and e.get('raw_bytes') == raw_bytes for e in load_index(self.archive_dir)):
+                # Archived before a crash, just not removed yet
+                os.remove(path)
+                return
+        tmp = dest + '.tmp'
+        with open(path, 'rb') as src, gzip.open(tmp, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp, dest)
+
+        with _index_lock:
+            entries = load_index(self.archive_dir)
+            entries = [e for e in entries if e['file'] != name]
+            entries.append({
+                'file': name,
+                'start': start,
+                'end': end,
+                'raw_bytes': raw_bytes,
+                'bytes': os.path.getsize(dest),
+            })
+            entries.sort(key=lambda e: e['start'] or 0)
+            # Keep disk use bounded: drop the oldest archives
+            while self.backupCount and len(entries) > self.backupCount:
+                old = entries.pop(0)
+                try:
+                    os.remove(os.path.join(self.archive_dir, old['file']))
+                except OSError:
+                    pass
+            _save_index(self.archive_dir, entries)
+        # Only now: readers treat the rotated file as pending until its archive is indexed
+        os.remove(path)
+
+
+def setup_logging(log_path, console=False, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT):
+    """Configure the root logger once (safe to call from every entry point)."""
+    root = logging.getLogger()
+    log_path = os.path.abspath(log_path)
+    if not any(isinstance(h, ArchivingFileHandler) and h.baseFilename == log_path for h in root.handlers):
+        handler = ArchivingFileHandler(log_path, max_bytes=max_bytes, backup_count=backup_count)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+    if console and not any(type(h) is logging.StreamHandler for h in root.handlers):
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(stream)
+    root.setLevel(logging.INFO)
+
+
+def parse_time_arg(value):
+    """Accept epoch seconds or an ISO timestamp (local time)."""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(value).timestamp()
+
+
+def sources_for_range(log_path, start=None, end=None):
+    """Archives (plus the live file) whose time range overlaps [start, end), oldest first."""
+    archive_dir = archive_dir_for(log_path)
+    sources = []
+    for entry in load_index(archive_dir):
+        if start is not None and entry.get('end') is not None and entry['end'] < start:
+            continue
+        if end is not None and entry.get('start') is not None and entry['start'] >= end:
+            continue
+        sources.append(os.path.join(archive_dir, entry['file']))
+    # Rotated but not compressed yet
+    for path in pending_rotations(log_path):
+        last = _last_time(path)
+        if start is None or last is None or last >= start:
+            sources.append(path)
+    if os.path.exists(log_path):
+        first = _first_time(log_path)
+        if end is None or first is None or first < end:
+            sources.append(log_path)
+    return sources
+
+
+def iter_range(log_path, start=None, end=None):
+    """Yield log lines with timestamps in [start, end). Continuation lines follow their record."""
+    for source in sources_for_range(log_path, start, end):
+        opener = gzip.open if source.endswith('.gz') else open
+        try:
+            f = opener(source, 'rt', encoding='utf-8', errors='replace')
+        except OSError:
+            continue
+        with f:
+            current = None
+            for line in f:
+                ts = parse_line_time(line)
+                if ts is not None:
+                    current = ts
+                if current is None:
+                    continue
+                if end is not None and current >= end:
+                    break
+                if start is None or current >= start:
+                    yield line
@@ -0,0 +1,133 @@
+import os
+import json
+import asyncio
+import logging
+from collections import deque
+
+from log_tail import read_since, tail_lines
+
+
+class LogBroadcaster:
+    """One shared watcher over the log file and bot status, fanned out to every
+    connected Server-Sent Events client through per-client queues."""
+
+    def __init__(self, log_path, status_fn, poll_interval=0.5, status_interval=2.0,
+                 keepalive_interval=15.0, backlog_lines=100, queue_size=200):
+        self.log_path = log_path
+        self.status_fn = status_fn
+        self.poll_interval = poll_interval
+        self.status_interval = status_interval
+        self.keepalive_interval = keepalive_interval
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.task = None
+        self.offset = None
+        self.inode = None
+        # Recent lines, sent to each new client so it doesn't need its own file read
+        self.recent = deque(maxlen=backlog_lines)
+        self.last_status = None
+
+    def subscribe(self):
+        q = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(q)
+        if self.task is None or self.task.done():
+            self._seed()
+            self.task = asyncio.create_task(self._watch())
+        return q
+
+    def unsubscribe(self, q):
+        self.subscribers.discard(q)
+
+    def snapshot(self):
+        """Events for a freshly connected (or resynced) client."""
+        events = [("logs", {"logs": "".join(self.recent), "offset": self.offset, "inode": self.inode, "reset": True})]
+        if self.last_status is not None:
+            events.append(("status", self.last_status))
+        return events
+
+    def _seed(self):
+        self.recent.clear()
+        self.offset = None
+        self.inode = None
+        if os.path.exists(self.log_path):
+            try:
+                text, self.offset, self.inode = tail_lines(self.log_path, self.recent.maxlen)
+                self.recent.extend(text.splitlines(keepends=True))
+            except OSError as e:
+                logging.warning(f"Log stream could not read {self.log_path}: {e}")
+        try:
+            self.last_status = self.status_fn()
+        except Exception as e:
+            logging.warning(f"Log stream could not build status: {e}")
+
+    def _publish(self, event, data):
+        for q in list(self.subscribers):
+            try:
+                q.put_nowait((event, data))
+            except asyncio.QueueFull:
+                # Slow client: drop its backlog and make it reload from the snapshot
+                while not q.empty():
+                    q.get_nowait()
+                q.put_nowait(("resync", None))
+
+    def _check_log(self):
+        try:
+            st = os.stat(self.log_path)
+        except OSError:
+            return None
+        if st.st_size == self.offset and st.st_ino == self.inode:
+            return None
+        return read_since(self.log_path, since=self.offset, inode=self.inode, max_lines=self.recent.maxlen)
+
+    async def _watch(self):
+        loop = asyncio.get_running_loop()
+        next_status = loop.time() + self.status_interval
+        while self.subscribers:
+            try:
+                update = await asyncio.to_thread(self._check_log)
+                if update is not None:
+                    self.offset = update["offset"]
+                    self.inode = update["inode"]
+                    lines = update["logs"].splitlines(keepends=True)
+                    if update["reset"]:
+                        self.recent.clear()
+                    self.recent.extend(lines)
+                    if lines or update["reset"]:
+                        self._publish("logs", update)
+
+                if loop.time() >= next_status:
+                    next_status = loop.time() + self.status_interval
+                    status = await asyncio.to_thread(self.status_fn)
+                    if status != self.last_status:
+                        self.last_status = status
+                        self._publish("status", status)
+            except Exception as e:
+                logging.warning(f"Log stream watcher error: {e}")
+            await asyncio.sleep(self.poll_interval)
+        self.task = None
+
+    async def events(self, request):
+        """Async generator of SSE-formatted chunks for one client."""
+        q = self.subscribe()
+        try:
+            for event, data in self.snapshot():
+                yield format_sse(event, data)
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    event, data = await asyncio.wait_for(q.get(), timeout=self.keepalive_interval)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event == "resync":
+                    for ev, d in self.snapshot():
+                        yield format_sse(ev, d)
+                else:
+                    yield format_sse(event, data)
+        finally:
+            self.unsubscribe(q)
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
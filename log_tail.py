@@ -0,0 +1,52 @@
+import os
+
+BLOCK_SIZE = 8192
+# Nếu client tụt lại quá xa thì trả về phần đuôi thay vì đọc lại toàn bộ phần thiếu
+MAX_CATCHUP_BYTES = 256 * 1024
+
+
+def tail_lines(path, max_lines=100, block_size=BLOCK_SIZE):
+    """Read the last `max_lines` lines of a file by seeking backwards from the end in blocks.
+    Returns (text, end_offset, inode)."""
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        end = st.st_size
+        pos = end
+        data = b''
+        # Need one extra newline so the first kept line is complete
+        while pos > 0 and data.count(b'\n') <= max_lines:
+            read_size = min(block_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            data = f.read(read_size) + data
+
+    lines = data.splitlines(keepends=True)[-max_lines:]
+    return b''.join(lines).decode('utf-8', errors='replace'), end, st.st_ino
+
+
+def read_since(path, since=None, inode=None, max_lines=100, max_bytes=MAX_CATCHUP_BYTES):
+    """Return the log lines appended after byte offset `since`.
+
+    If there is no cursor, the file was truncated/rotated (size shrank or inode changed),
+    or the client is too far behind, fall back to the last `max_lines` lines and flag `reset`
+    so the client replaces what it shows instead of appending."""
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        size = st.st_size
+        rotated = inode is not None and inode != st.st_ino
+        if since is None or since < 0 or since > size or rotated or size - since > max_bytes:
+            f.close()
+            text, end, ino = tail_lines(path, max_lines)
+            return {"logs": text, "offset": end, "inode": ino, "reset": True}
+
+        f.seek(since)
+        data = f.read(size - since)
+
+    # Only hand out complete lines; a partial last line is picked up on the next poll
+    cut = data.rfind(b'\n') + 1
+    return {
+        "logs": data[:cut].decode('utf-8', errors='replace'),
+        "offset": since + cut,
+        "inode": st.st_ino,
+        "reset": False,
+    }
@@ -0,0 +1,180 @@
+import time
+import logging
+import platform
+import subprocess
+import threading
+from collections import deque
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Recycling on memory is opt-in (0 = off); the config model uses the same default
+DEFAULT_BUDGET_MB = 0
+
+
+def _process_table():
+    """{pid: (ppid, rss_bytes)} for every process, via psutil or `ps`."""
+    table = {}
+    if psutil is not None:
+        for proc in psutil.process_iter(['pid', 'ppid', 'memory_info']):
+            info = proc.info
+            if info.get('memory_info') is not None:
+                table[info['pid']] = (info['ppid'], info['memory_info'].rss)
+        return table
+    if platform.system() == 'Windows':
+        return None
+    output = subprocess.check_output(['ps', '-A', '-o', 'pid=,ppid=,rss='], timeout=10).decode('utf-8', 'replace')
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) != 3:
+            continue
+        try:
+            pid, ppid, rss_kb = int(parts[0]), int(parts[1]), int(parts[2])
+        except ValueError:
+            continue
+        table[pid] = (ppid, rss_kb * 1024)
+    return table
+
+
+def tree_rss(root_pids):
+    """Total RSS of the given processes and all their descendants."""
+    table = _process_table()
+    if table is None:
+        return None
+    children = {}
+    for pid, (ppid, _) in table.items():
+        children.setdefault(ppid, []).append(pid)
+    seen = set()
+    stack = [p for p in root_pids if p in table]
+    while stack:
+        pid = stack.pop()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        stack.extend(children.get(pid, []))
+    return {
+        "rss_bytes": sum(table[p][1] for p in seen),
+        "processes": len(seen),
+    }
+
+
+def driver_pids(driver):
+    pids = []
+    service = getattr(driver, 'service', None)
+    process = getattr(service, 'process', None)
+    if process is not None and getattr(process, 'pid', None):
+        pids.append(process.pid)
+    browser_pid = getattr(driver, 'browser_pid', None)
+    if browser_pid:
+        pids.append(browser_pid)
+    return pids
+
+
+class MemoryWatchdog:
+    """Samples RSS of chromedriver + the Chrome process tree on a low-frequency background
+    thread. The bot thread asks should_recycle() at safe points and restarts the driver
+    itself, so the watchdog never touches the WebDriver session."""
+
+    def __init__(self, interval=60, history=120):
+        self.interval = interval
+        self.samples = deque(maxlen=history)
+        self.root_pids = []
+        self.budget_mb = DEFAULT_BUDGET_MB
+        self.max_cycles = 0
+        self.cycles = 0
+        self.driver_started = None
+        self.recycles = 0
+        self.last_recycle = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def configure(self, config):
+        self.budget_mb = int(config.get('memory_budget_mb', DEFAULT_BUDGET_MB) or 0)
+        self.max_cycles = int(config.get('recycle_every_cycles', 0) or 0)
+
+    def watch(self, driver):
+        """Start (or re-point) sampling at a newly created driver."""
+        with self._lock:
+            self.root_pids = driver_pids(driver)
+            self.cycles = 0
+            self.driver_started = time.time()
+        self._stopped.clear()
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="memory-watchdog", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        with self._lock:
+            self.root_pids = []
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            self.sample()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def sample(self):
+        with self._lock:
+            pids = list(self.root_pids)
+        if not pids:
+            return None
+        try:
+            usage = tree_rss(pids)
+        except Exception as e:
+            logging.debug(f"Memory sample failed: {e}")
+            return None
+        if usage is None:
+            return None
+        entry = {
+            "time": time.time(),
+            "rss_mb": round(usage["rss_bytes"] / 1048576, 1),
+            "processes": usage["processes"],
+        }
+        self.samples.append(entry)
+        return entry
+
+    def cycle_completed(self):
+        with self._lock:
+            self.cycles += 1
+
+    def should_recycle(self):
+        """Reason to recycle the driver now, or None."""
+        if self.max_cycles and self.cycles >= self.max_cycles:
+            return f"{self.cycles} cycles since last browser start"
+        if self.budget_mb:
+            latest = self.samples[-1] if self.samples else None
+            # Ignore samples taken from a previous browser instance
+            if latest and latest["time"] >= (self.driver_started or 0) and latest["rss_mb"] > self.budget_mb:
+                return f"browser RSS {latest['rss_mb']} MB over budget {self.budget_mb} MB"
+        return None
+
+    def recycled(self, reason):
+        self.recycles += 1
+        self.last_recycle = {"time": time.time(), "reason": reason}
+
+    def summary(self, last=None):
+        samples = list(self.samples)
+        if last:
+            samples = samples[-last:]
+        return {
+            "current_mb": samples[-1]["rss_mb"] if samples else None,
+            "peak_mb": max((s["rss_mb"] for s in samples), default=None),
+            "budget_mb": self.budget_mb,
+            "recycle_every_cycles": self.max_cycles,
+            "cycles_since_start": self.cycles,
+            "driver_started": self.driver_started,
+            "recycles": self.recycles,
+            "last_recycle": self.last_recycle,
+            "samples": samples,
+        }
+
+
+# Shared by the bot thread and the status API
+watchdog = MemoryWatchdog()
@@ -0,0 +1,148 @@
+import time
+import threading
+
+# Phases take anything from under a second (a click) to several minutes (login with 2FA)
+DEFAULT_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+
+class Histogram:
+    """Fixed-bucket histogram: memory stays constant no matter how many samples are recorded."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        out = []
+        for bound, c in zip(self.buckets + (float('inf'),), self.counts):
+            total += c
+            out.append((bound, total))
+        return out
+
+
+class Span:
+    def __init__(self, registry, phase):
+        self.registry = registry
+        self.phase = phase
+        self.ok = True
+        self.start = None
+        self.duration = None
+
+    def fail(self):
+        """Mark the phase as failed for steps that report errors via return value instead of raising."""
+        self.ok = False
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None and not issubclass(exc_type, Exception):
+            # Interrupted (stop requested / Ctrl+C), neither a success nor a failure
+            return False
+        self.registry.record(self.phase, self.duration, self.ok and exc_type is None)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self, buckets=DEFAULT_BUCKETS, max_phases=50):
+        self.buckets = buckets
+        self.max_phases = max_phases
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.outcomes = {}
+        self.last = {}
+        self.last_success = {}
+
+    def span(self, phase):
+        return Span(self, phase)
+
+    def record(self, phase, duration, ok=True):
+        with self._lock:
+            hist = self.histograms.get(phase)
+            if hist is None:
+                if len(self.histograms) >= self.max_phases:
+                    return
+                hist = self.histograms[phase] = Histogram(self.buckets)
+                self.outcomes[phase] = {"success": 0, "failure": 0}
+            hist.observe(duration)
+            self.outcomes[phase]["success" if ok else "failure"] += 1
+            self.last[phase] = {"duration": duration, "ok": ok, "time": time.time()}
+            if ok:
+                self.last_success[phase] = self.last[phase]["time"]
+
+    def phase_health(self):
+        """Per phase: time of the last run, whether it succeeded, and the last success."""
+        with self._lock:
+            return {
+                phase: {
+                    "last_run": last["time"],
+                    "last_ok": last["ok"],
+                    "last_duration": round(last["duration"], 3),
+                    "last_success": self.last_success.get(phase),
+                }
+                for phase, last in self.last.items()
+            }
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                phase: {
+                    "count": hist.count,
+                    "sum": hist.sum,
+                    "buckets": hist.cumulative(),
+                    "outcomes": dict(self.outcomes[phase]),
+                    "last": dict(self.last[phase]),
+                }
+                for phase, hist in self.histograms.items()
+            }
+
+    def render_prometheus(self, prefix="fbbot"):
+        snap = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_phase_duration_seconds Duration of each bot phase.",
+            f"# TYPE {prefix}_phase_duration_seconds histogram",
+        ]
+        for phase, data in sorted(snap.items()):
+            label = _escape(phase)
+            for bound, count in data["buckets"]:
+                le = "+Inf" if bound == float('inf') else repr(float(bound))
+                lines.append(f'{prefix}_phase_duration_seconds_bucket{{phase="{label}",le="{le}"}} {count}')
+            lines.append(f'{prefix}_phase_duration_seconds_sum{{phase="{label}"}} {data["sum"]:.6f}')
+            lines.append(f'{prefix}_phase_duration_seconds_count{{phase="{label}"}} {data["count"]}')
+
+        lines.append(f"# HELP {prefix}_phase_total Completed bot phases by outcome.")
+        lines.append(f"# TYPE {prefix}_phase_total counter")
+        for phase, data in sorted(snap.items()):
+            label = _escape(phase)
+            for outcome, count in sorted(data["outcomes"].items()):
+                lines.append(f'{prefix}_phase_total{{phase="{label}",outcome="{outcome}"}} {count}')
+
+        lines.append(f"# HELP {prefix}_phase_last_duration_seconds Duration of the most recent run of each phase.")
+        lines.append(f"# TYPE {prefix}_phase_last_duration_seconds gauge")
+        for phase, data in sorted(snap.items()):
+            lines.append(f'{prefix}_phase_last_duration_seconds{{phase="{_escape(phase)}"}} {data["last"]["duration"]:.6f}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Shared by the bot thread and the API (same process when started from app.py)
+registry = MetricsRegistry()
+span = registry.span
@@ -0,0 +1,5 @@
+import os
+
+# Project root: config.json, cookies.json, pic/, logs and state files live here.
+# Kept in its own module so the dashboard can use it without importing selenium.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
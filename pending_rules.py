@@ -0,0 +1,74 @@
+import json
+
+# Kết quả phân loại trang "bài viết đang chờ"
+EMPTY = "empty"
+ERROR = "error"
+HAS_PENDING = "has_pending"
+UNKNOWN = "unknown"
+
+# Text markers (lower-case) used by the in-page probe, which the bot and delete_pending.py share
+RULES = {
+    # Lỗi kỹ thuật có nút "Tải lại trang"
+    "reloadable_error": [
+        "trang này hiện không hiển thị",
+        "trang này không hiển thị",
+    ],
+    "error": [
+        "trang này hiện không hiển thị",
+        "trang này không hiển thị",
+        "this page isn't available",
+        "liên kết đã hỏng",
+    ],
+    "empty": [
+        "không có bài",
+        "không có bài viết nào để hiển thị",
+        "nothing to show",
+        "no posts to show",
+        "no pending posts",
+    ],
+    # Header such as "Đang chờ · 2"
+    "pending_count_pattern": r"(đang chờ|pending( posts)?)\s*\n*\s*·\s*\d+",
+    # Edit/Delete buttons only count when the page also mentions pending
+    "action_pairs": [["chỉnh sửa", "xóa"], ["edit", "delete"]],
+    "pending_words": ["đang chờ", "pending"],
+}
+
+ARTICLE_SELECTOR = "div[role='article']"
+
+# The rules are applied only here (no Python copy to drift out of sync).
+# Runs in the page: one round trip returns a few bytes instead of the whole body.text
+PROBE_JS = """
+const rules = %s;
+const text = ((document.body && document.body.innerText) || '').toLowerCase();
+const articles = document.querySelectorAll(%s).length;
+const has = (m) => text.indexOf(m) !== -1;
+let state = %s, reason = 'no_marker';
+if (rules.error.some(has)) { state = %s; reason = 'error_marker'; }
+else if (rules.empty.some(has)) { state = %s; reason = 'empty_marker'; }
+else if (articles > 0) { state = %s; reason = 'articles'; }
+else if (new RegExp(rules.pending_count_pattern, 'u').test(text)) { state = %s; reason = 'count_header'; }
+else if (rules.action_pairs.some((p) => has(p[0]) && has(p[1])) && rules.pending_words.some(has)) {
+    state = %s; reason = 'action_buttons';
+}
+return {
+    state: state,
+    reason: reason,
+    articles: articles,
+    reloadable: rules.reloadable_error.some(has),
+    url: window.location.href
+};
+""" % (
+    json.dumps(RULES, ensure_ascii=False),
+    json.dumps(ARTICLE_SELECTOR),
+    json.dumps(UNKNOWN),
+    json.dumps(ERROR),
+    json.dumps(EMPTY),
+    json.dumps(HAS_PENDING),
+    json.dumps(HAS_PENDING),
+    json.dumps(HAS_PENDING),
+)
+
+
+def probe_page(driver):
+    """Classify the current page in a single execute_script call."""
+    return driver.execute_script(PROBE_JS)
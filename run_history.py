@@ -0,0 +1,120 @@
+import time
+import sqlite3
+import threading
+
+from storage import PerPath
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    group_url TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL,
+    outcome TEXT NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_group_time ON attempts (group_url, started_at);
+CREATE INDEX IF NOT EXISTS idx_attempts_time ON attempts (started_at);
+"""
+
+SUCCESS_OUTCOMES = ("posted",)
+
+
+class RunHistory:
+    """SQLite store with one row per group attempt, indexed by group URL and time."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self._lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+            self.conn.commit()
+
+    def record_attempt(self, group_url, outcome, started_at=None, duration=None, error=None):
+        if started_at is None:
+            started_at = time.time() - (duration or 0)
+        with self._lock:
+            cur = self.conn.execute(
+                "INSERT INTO attempts (group_url, started_at, duration, outcome, error) VALUES (?, ?, ?, ?, ?)",
+                (group_url, started_at, duration, outcome, error),
+            )
+            self.conn.commit()
+            return cur.lastrowid
+
+    def get(self, attempt_id):
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM attempts WHERE id = ?", (attempt_id,)).fetchone()
+        return dict(row) if row else None
+
+    def page(self, page=1, per_page=50, group_url=None, outcome=None, since=None, until=None):
+        page = max(1, page)
+        per_page = max(1, min(per_page, 500))
+        where, args = [], []
+        if group_url:
+            where.append("group_url = ?")
+            args.append(group_url)
+        if outcome:
+            where.append("outcome = ?")
+            args.append(outcome)
+        if since is not None:
+            where.append("started_at >= ?")
+            args.append(since)
+        if until is not None:
+            where.append("started_at < ?")
+            args.append(until)
+        clause = ("WHERE " + " AND ".join(where)) if where else ""
+        with self._lock:
+            total = self.conn.execute(f"SELECT COUNT(*) FROM attempts {clause}", args).fetchone()[0]
+            rows = self.conn.execute(
+                f"SELECT * FROM attempts {clause} ORDER BY started_at DESC LIMIT ? OFFSET ?",
+                args + [per_page, (page - 1) * per_page],
+            ).fetchall()
+        return {
+            "page": page,
+            "per_page": per_page,
+            "total": total,
+            "items": [dict(r) for r in rows],
+        }
+
+    def group_summary(self, group_url=None):
+        """Per-group attempt counts plus the time and duration of the last success."""
+        success = ",".join("?" for _ in SUCCESS_OUTCOMES)
+        sql = f"""
+            SELECT a.group_url,
+                   COUNT(*) AS attempts,
+                   SUM(CASE WHEN a.outcome IN ({success}) THEN 1 ELSE 0 END) AS successes,
+                   SUM(CASE WHEN a.outcome = 'failed' THEN 1 ELSE 0 END) AS failures,
+                   MAX(a.started_at) AS last_attempt_at,
+                   AVG(CASE WHEN a.outcome IN ({success}) THEN a.duration END) AS avg_success_duration,
+                   (SELECT s.started_at FROM attempts s
+                     WHERE s.group_url = a.group_url AND s.outcome IN ({success})
+                     ORDER BY s.started_at DESC LIMIT 1) AS last_success_at,
+                   (SELECT s.duration FROM attempts s
+                     WHERE s.group_url = a.group_url AND s.outcome IN ({success})
+                     ORDER BY s.started_at DESC LIMIT 1) AS last_success_duration
+            FROM attempts a
+            {"WHERE a.group_url = ?" if group_url else ""}
+            GROUP BY a.group_url
+            ORDER BY last_attempt_at DESC
+        """
+        args = list(SUCCESS_OUTCOMES) * 4
+        if group_url:
+            args.append(group_url)
+        with self._lock:
+            rows = self.conn.execute(sql, args).fetchall()
+        return [dict(r) for r in rows]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+_stores = PerPath(RunHistory)
+
+
+def get_history(path):
+    """Shared store per database file for the bot thread and the API."""
+    return _stores.get(path)
@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import logging
+import threading
+
+from log_tail import tail_lines
+from storage import atomic_write_bytes
+
+# Outcomes recorded per group attempt
+POSTED = "posted"
+SKIPPED_PENDING = "skipped_pending"
+SKIPPED_CACHED = "skipped_cached"
+NAV_FAILED = "nav_failed"
+FAILED = "failed"
+CYCLE_COMPLETE = "cycle_complete"
+PAUSED = "paused"
+
+
+class RunJournal:
+    """Append-only JSONL journal of group attempts.
+
+    Every record is fsync'd on append, so a crash can at worst lose a torn last line, and
+    the resume point is recovered by reading only the end of the file. Records are keyed
+    by group URL, so editing group_urls doesn't shift where the bot resumes."""
+
+    def __init__(self, path, max_bytes=256 * 1024, keep=200, legacy_state_path=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.legacy_state_path = legacy_state_path
+        self._lock = threading.Lock()
+        self._last = None
+        self._repair_tail()
+
+    def _repair_tail(self):
+        """Terminate a torn last line so the next append starts on a fresh line."""
+        try:
+            with open(self.path, 'rb+') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() == 0:
+                    return
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                    logging.warning("Run journal had a torn last record; it will be ignored.")
+        except FileNotFoundError:
+            pass
+
+    def _read_tail(self, n):
+        if not os.path.exists(self.path):
+            return []
+        text, _, _ = tail_lines(self.path, n)
+        records = []
+        for line in text.splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return records
+
+    def append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._last = record
+            try:
+                too_big = os.path.getsize(self.path) > self.max_bytes
+            except OSError:
+                too_big = False
+        if too_big:
+            self.compact()
+        return record
+
+    def record_group(self, url, outcome, duration=None, next_url=None, **extra):
+        record = {
+            "ts": time.time(),
+            "url": url,
+            "outcome": outcome,
+            "duration": round(duration, 3) if duration is not None else None,
+            "next_url": next_url,
+        }
+        record.update(extra)
+        return self.append(record)
+
+    def complete_cycle(self):
+        return self.append({"ts": time.time(), "url": None, "outcome": CYCLE_COMPLETE})
+
+    def checkpoint_pause(self, next_url):
+        """Persist where a paused bot will continue, so a resume after restart picks the same group."""
+        return self.append({"ts": time.time(), "url": None, "outcome": PAUSED, "next_url": next_url})
+
+    def last(self):
+        with self._lock:
+            if self._last is None:
+                # A few lines back in case the very last one was torn
+                records = self._read_tail(5)
+                self._last = records[-1] if records else None
+            return self._last
+
+    def recent(self, n=50):
+        with self._lock:
+            return self._read_tail(n)
+
+    def resume_index(self, groups):
+        """Index in `groups` to continue from, based on the last journal record."""
+        last = self.last()
+        if last is None:
+            return self._legacy_index(groups)
+        if last.get("outcome") == CYCLE_COMPLETE:
+            return 0
+        url = last.get("url")
+        if url in groups:
+            # A failed group is retried, like the old index that was only saved on success
+            if last.get("outcome") == FAILED:
+                return groups.index(url)
+            return groups.index(url) + 1
+        # The group was removed from the list: continue with whatever followed it
+        next_url = last.get("next_url")
+        if next_url in groups:
+            return groups.index(next_url)
+        return 0
+
+    def _legacy_index(self, groups):
+        if not self.legacy_state_path or not os.path.exists(self.legacy_state_path):
+            return 0
+        try:
+            with open(self.legacy_state_path, 'r', encoding='utf-8') as f:
+                index = json.load(f).get('current_index', 0)
+            return index if 0 <= index < len(groups) else 0
+        except Exception:
+            return 0
+
+    def compact(self):
+        """Rewrite the journal with only the most recent records (temp file + fsync + rename)."""
+        with self._lock:
+            records = self._read_tail(self.keep)
+            raw = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+            atomic_write_bytes(self.path, raw.encode('utf-8'), fsync=True)
+        logging.info(f"Compacted run journal to {len(records)} records.")
@@ -0,0 +1,116 @@
+import os
+import json
+import time
+import logging
+import threading
+
+from storage import PerPath, atomic_write_json
+
+# Weight of past results: each new result multiplies the old score by this
+DECAY = 0.8
+# A selector that hasn't matched for this long (while being tried) is reported as stale
+STALE_AFTER = 14 * 24 * 3600
+
+
+def selector_key(selector):
+    """Stable string for a selector: plain XPath strings or (By, value) tuples."""
+    if isinstance(selector, (tuple, list)):
+        return f"{selector[0]}={selector[1]}"
+    return str(selector)
+
+
+class SelectorRegistry:
+    """Remembers which selector of each fallback chain matched, so the next call tries
+    the recently successful ones first instead of waiting out the timeouts of those
+    listed before it. Untried selectors keep their declared order."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.chains = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.chains = json.load(f)
+        except Exception as e:
+            logging.warning(f"Could not read selector stats, starting empty: {e}")
+            self.chains = {}
+
+    def _save(self):
+        try:
+            atomic_write_json(self.path, self.chains)
+        except Exception as e:
+            logging.warning(f"Failed to save selector stats: {e}")
+
+    def _entry(self, chain, selector):
+        entries = self.chains.setdefault(chain, {})
+        return entries.setdefault(selector_key(selector), {
+            "hits": 0, "misses": 0, "score": 0.0, "last_hit": None, "last_tried": None,
+        })
+
+    def order(self, chain, selectors):
+        """`selectors` sorted by recent success (stable, so ties keep the declared order)."""
+        with self._lock:
+            entries = self.chains.get(chain, {})
+            scores = [entries.get(selector_key(s), {}).get("score", 0.0) for s in selectors]
+        ranked = sorted(range(len(selectors)), key=lambda i: -scores[i])
+        return [selectors[i] for i in ranked]
+
+    def record(self, chain, selector, ok):
+        with self._lock:
+            entry = self._entry(chain, selector)
+            now = time.time()
+            entry["score"] = entry["score"] * DECAY + (1.0 if ok else 0.0)
+            entry["last_tried"] = now
+            if ok:
+                entry["hits"] += 1
+                entry["last_hit"] = now
+                # Misses are only kept in memory until the next hit, one write per chain call
+                self._save()
+            else:
+                entry["misses"] += 1
+
+    def flush(self):
+        with self._lock:
+            self._save()
+
+    def reset(self, chain=None):
+        with self._lock:
+            if chain is None:
+                self.chains = {}
+            else:
+                self.chains.pop(chain, None)
+            self._save()
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            result = {}
+            for chain, entries in self.chains.items():
+                rows = []
+                for key, e in entries.items():
+                    tried = e["hits"] + e["misses"]
+                    rows.append({
+                        "selector": key,
+                        "hits": e["hits"],
+                        "misses": e["misses"],
+                        "hit_rate": round(e["hits"] / tried, 3) if tried else None,
+                        "score": round(e["score"], 3),
+                        "last_hit": e["last_hit"],
+                        "last_tried": e["last_tried"],
+                        "stale": bool(e["misses"]) and (e["last_hit"] is None or now - e["last_hit"] > STALE_AFTER),
+                    })
+                rows.sort(key=lambda r: -r["score"])
+                result[chain] = rows
+            return result
+
+
+_registries = PerPath(SelectorRegistry)
+
+
+def get_selector_registry(path):
+    return _registries.get(path)
@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import threading
+from collections import Counter
+
+MAX_DURATION = 120
+MIN_INTERVAL = 0.001
+MAX_DEPTH = 128
+
+
+def _label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _stack(frame):
+    """Root-first list of frame labels."""
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class StackSampler:
+    """Wall-clock sampling profiler for one thread, driven from another thread.
+
+    Reads the target thread's current frame via sys._current_frames() every `interval`
+    seconds; the sampled thread itself runs unmodified, and nothing runs at all unless
+    a profile was requested. Only one profile runs at a time."""
+
+    def __init__(self):
+        self._busy = threading.Lock()
+        self.last = None
+
+    def sample(self, thread_id, duration, interval=0.01):
+        """Returns {"samples", "duration", "interval", "stacks": Counter(collapsed -> n)} or None if busy."""
+        duration = max(0.0, min(float(duration), MAX_DURATION))
+        interval = max(MIN_INTERVAL, float(interval))
+        if not self._busy.acquire(blocking=False):
+            return None
+        try:
+            stacks = Counter()
+            samples = 0
+            missed = 0
+            start = time.perf_counter()
+            deadline = start + duration
+            next_tick = start
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                frame = sys._current_frames().get(thread_id)
+                if frame is None:
+                    # Thread ended (bot stopped mid-profile)
+                    break
+                stacks[";".join(_stack(frame))] += 1
+                del frame
+                samples += 1
+                next_tick += interval
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Falling behind: skip ticks instead of sampling in a burst
+                    skipped = int(-delay // interval) + 1
+                    missed += skipped
+                    next_tick += skipped * interval
+            result = {
+                "samples": samples,
+                "missed": missed,
+                "duration": round(time.perf_counter() - start, 3),
+                "interval": interval,
+                "stacks": stacks,
+            }
+            self.last = result
+            return result
+        finally:
+            self._busy.release()
+
+    @property
+    def busy(self):
+        return self._busy.locked()
+
+
+def collapsed(result):
+    """Brendan Gregg's collapsed format ("frame;frame;frame count" per line), ready for
+    flamegraph.pl or speedscope."""
+    return "".join(f"{stack} {count}\n" for stack, count in result["stacks"].most_common())
+
+
+def top_functions(result, n=25):
+    """Self (leaf) and inclusive sample counts per function."""
+    own = Counter()
+    inclusive = Counter()
+    for stack, count in result["stacks"].items():
+        frames = stack.split(";")
+        own[frames[-1]] += count
+        for label in set(frames):
+            inclusive[label] += count
+    total = result["samples"] or 1
+
+    def as_rows(counter):
+        return [{"function": label, "samples": c, "percent": round(100.0 * c / total, 1)}
+                for label, c in counter.most_common(n)]
+
+    return {"self": as_rows(own), "inclusive": as_rows(inclusive)}
+
+
+# Shared by the API endpoint
+sampler = StackSampler()
@@ -0,0 +1,56 @@
+import os
+import json
+import threading
+
+
+def fsync_dir(path):
+    # Make a rename into path's directory durable (no-op where directories can't be opened, e.g. Windows)
+    try:
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path, raw, fsync=False):
+    """Replace `path` with `raw` through a temp file + rename, so readers never see a
+    half-written file. With fsync=True the data and the rename reach the disk first."""
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(raw)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+    if fsync:
+        fsync_dir(path)
+
+
+def atomic_write_json(path, data, fsync=False, indent=2):
+    """atomic_write_bytes for a JSON document (UTF-8, non-ASCII kept). Returns the bytes written."""
+    raw = json.dumps(data, ensure_ascii=False, indent=indent).encode('utf-8')
+    atomic_write_bytes(path, raw, fsync)
+    return raw
+
+
+class PerPath:
+    """One shared instance per absolute path, so the bot thread and the API use the same
+    object (and its in-memory state) for a given file or folder."""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, *args):
+        path = os.path.abspath(path)
+        with self._lock:
+            item = self._items.get(path)
+            if item is None:
+                item = self._items[path] = self.factory(path, *args)
+            return item
@@ -0,0 +1,137 @@
+import time
+import logging
+import threading
+
+STARTING = "starting"
+RUNNING = "running"
+RESTING = "resting"
+PAUSED = "paused"
+CLEANING = "cleaning"
+STOPPING = "stopping"
+STOPPED = "stopped"
+
+
+class BotStopped(BaseException):
+    """Raised from interruptible sleeps and waits once a stop has been requested.
+    Like KeyboardInterrupt it is not an Exception, so the page code's broad
+    `except Exception` fallbacks don't swallow it."""
+
+
+class BotSupervisor:
+    """Owns the bot thread. The driver is created and torn down only on that thread;
+    stop() just signals it through a threading.Event that every bot sleep waits on."""
+
+    def __init__(self, restart_delay=60):
+        self.restart_delay = restart_delay
+        self.stop_event = threading.Event()
+        # Set while the bot may proceed; cleared by pause() to hold it at the next safe point
+        self.resume_event = threading.Event()
+        self.resume_event.set()
+        self._lock = threading.Lock()
+        self.thread = None
+        self.bot = None
+        self.state = STOPPED
+        self.state_since = time.time()
+        self.last_error = None
+        self.restarts = 0
+        self.mode = "post"
+
+    def set_state(self, state):
+        with self._lock:
+            if self.state == STOPPING and state != STOPPED:
+                # Once stopping, only the final transition is meaningful
+                return
+            if state != self.state:
+                self.state = state
+                self.state_since = time.time()
+                logging.info(f"Bot state: {state}")
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, mode="post"):
+        """Start the bot thread. mode="cleanup" logs in, runs the queued cleanup job and exits."""
+        with self._lock:
+            if self.thread is not None and self.thread.is_alive():
+                return False
+            self.stop_event.clear()
+            self.resume_event.set()
+            self.state = STARTING
+            self.state_since = time.time()
+            self.mode = mode
+            self.thread = threading.Thread(target=self._run, name="bot-supervisor", daemon=True)
+            self.thread.start()
+        return True
+
+    def stop(self, timeout=None):
+        """Request a stop. Returns immediately unless `timeout` is given."""
+        if not self.is_running():
+            return False
+        self.set_state(STOPPING)
+        self.stop_event.set()
+        if timeout:
+            self.thread.join(timeout)
+        return True
+
+    def pause(self):
+        """Hold the bot between groups with the browser session kept alive."""
+        if not self.is_running() or not self.resume_event.is_set():
+            return False
+        self.resume_event.clear()
+        logging.info("Pause requested; the bot will hold before its next group.")
+        return True
+
+    def resume(self):
+        """Release a paused bot, or start one that continues from the persisted checkpoint."""
+        if not self.is_running():
+            return self.start()
+        if self.resume_event.is_set():
+            return False
+        self.resume_event.set()
+        return True
+
+    def _run(self):
+        # Imported here so the dashboard doesn't pay for selenium until the bot starts
+        from facebook_bot import FacebookBot
+
+        while not self.stop_event.is_set():
+            try:
+                logging.info("--- STARTING NEW FULL CYCLE ---")
+                self.set_state(STARTING)
+                self.bot = FacebookBot(stop_event=self.stop_event, on_state=self.set_state,
+                                       resume_event=self.resume_event)
+                if self.mode == "cleanup":
+                    self.bot.run_cleanup_only(is_gui=True)
+                else:
+                    self.bot.run(is_gui=True, continuous=True)
+                # run() returns normally only when stopped or out of work
+                break
+            except BotStopped:
+                break
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                if self.stop_event.is_set():
+                    break
+                self.restarts += 1
+                logging.error(f"FATAL: Bot crashed during run: {e}. Restarting in {self.restart_delay}s...")
+                # Interruptible: a stop during the back-off takes effect immediately
+                if self.stop_event.wait(self.restart_delay):
+                    break
+            finally:
+                self.bot = None
+
+        logging.info("Background bot task terminated.")
+        with self._lock:
+            self.state = STOPPED
+            self.state_since = time.time()
+
+    def status(self):
+        return {
+            "state": self.state,
+            "state_since": self.state_since,
+            "running": self.is_running(),
+            "mode": self.mode,
+            "pause_requested": not self.resume_event.is_set(),
+            "restarts": self.restarts,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,160 @@
+import sys
+import types
+
+import pytest
+
+import cleanup_job
+from cleanup_job import CleanupJob
+
+
+class FakeGroupCache:
+    def __init__(self):
+        self.invalidated = []
+
+    def invalidate(self, url=None):
+        self.invalidated.append(url)
+
+
+class FakeBot:
+    def __init__(self):
+        self.group_cache = FakeGroupCache()
+
+
+class Stop(BaseException):
+    """Stands in for BotStopped."""
+
+
+@pytest.fixture
+def fake_delete(monkeypatch):
+    """Installs a fake delete_pending module; `plan[url]` is a list of per-call scripts.
+
+    A script is (deletions, outcome): outcome is "ok", "error", "unreachable" or "stop"
+    (raise after `deletions` deletions, like a bot stop mid-group)."""
+    plan = {}
+    calls = []
+
+    def delete_all_pending(bot, url, should_stop=None, on_deleted=None):
+        calls.append(url)
+        deletions, outcome = plan[url].pop(0)
+        if outcome == "unreachable":
+            return {"deleted": 0, "reachable": False, "error": None}
+        for i in range(1, deletions + 1):
+            if on_deleted:
+                on_deleted(i)
+        if outcome == "stop":
+            raise Stop()
+        return {"deleted": deletions, "reachable": True, "error": "boom" if outcome == "error" else None}
+
+    module = types.ModuleType("delete_pending")
+    module.delete_all_pending = delete_all_pending
+    monkeypatch.setitem(sys.modules, "delete_pending", module)
+    return plan, calls
+
+
+def groups_by_url(job):
+    return {g["url"]: g for g in job.status()["groups"]}
+
+
+def test_runs_every_group_and_sums_deletions(tmp_path, fake_delete):
+    plan, calls = fake_delete
+    plan.update({"a": [(2, "ok")], "b": [(0, "unreachable")], "c": [(1, "ok")]})
+    job = CleanupJob(str(tmp_path / "progress.json"))
+    bot = FakeBot()
+
+    assert job.request(["a", "b", "c"])
+    job.run(bot)
+
+    status = job.status()
+    assert status["state"] == cleanup_job.DONE
+    assert status["deleted"] == 3
+    assert status["groups_done"] == 3
+    groups = groups_by_url(job)
+    assert groups["b"]["state"] == cleanup_job.GROUP_UNREACHABLE
+    assert bot.group_cache.invalidated == ["a", "c"]
+
+
+def test_resume_after_stop_keeps_earlier_deletions(tmp_path, fake_delete):
+    plan, calls = fake_delete
+    plan.update({"a": [(2, "ok")], "b": [(3, "stop"), (4, "ok")]})
+    path = str(tmp_path / "progress.json")
+    job = CleanupJob(path)
+    job.request(["a", "b"])
+
+    with pytest.raises(Stop):
+        job.run(FakeBot())
+    assert job.status()["state"] == cleanup_job.INTERRUPTED
+    assert groups_by_url(job)["b"]["deleted"] == 3
+
+    job.request(["a", "b"])
+    job.run(FakeBot())
+
+    # Group "a" was finished and isn't retried; "b" continues from 3
+    assert calls == ["a", "b", "b"]
+    groups = groups_by_url(job)
+    assert groups["a"]["deleted"] == 2
+    assert groups["b"]["deleted"] == 7
+    assert job.status()["deleted"] == 9
+
+
+def test_failed_group_retry_accumulates(tmp_path, fake_delete):
+    plan, calls = fake_delete
+    plan.update({"a": [(2, "error"), (1, "ok")]})
+    job = CleanupJob(str(tmp_path / "progress.json"))
+    job.request(["a"])
+    job.run(FakeBot())
+    assert groups_by_url(job)["a"]["state"] == cleanup_job.GROUP_FAILED
+
+    # A failed group is retried when the same job is requested again
+    job.progress["state"] = cleanup_job.INTERRUPTED
+    job.request(["a"])
+    job.run(FakeBot())
+    group = groups_by_url(job)["a"]
+    assert group["state"] == cleanup_job.GROUP_DONE
+    assert group["deleted"] == 3
+
+
+def test_progress_survives_restart_without_auto_resume(tmp_path, fake_delete):
+    plan, calls = fake_delete
+    plan.update({"a": [(2, "stop"), (1, "ok")]})
+    path = str(tmp_path / "progress.json")
+    job = CleanupJob(path)
+    job.request(["a"])
+    with pytest.raises(Stop):
+        job.run(FakeBot())
+
+    # New process: the job is loaded but not queued
+    reloaded = CleanupJob(path)
+    assert reloaded.status()["state"] == cleanup_job.INTERRUPTED
+    assert not reloaded.requested.is_set()
+    assert reloaded.run(FakeBot()) is None
+    assert calls == ["a"]
+
+    reloaded.request(["a"])
+    reloaded.run(FakeBot())
+    assert calls == ["a", "a"]
+    assert groups_by_url(reloaded)["a"]["deleted"] == 3
+
+
+def test_new_groups_start_a_fresh_job(tmp_path, fake_delete):
+    plan, calls = fake_delete
+    plan.update({"a": [(2, "stop")], "b": [(1, "ok")]})
+    job = CleanupJob(str(tmp_path / "progress.json"))
+    job.request(["a"])
+    with pytest.raises(Stop):
+        job.run(FakeBot())
+
+    job.request(["b"])
+    job.run(FakeBot())
+    status = job.status()
+    assert [g["url"] for g in status["groups"]] == ["b"]
+    assert status["deleted"] == 1
+
+
+def test_cancel_before_pickup(tmp_path, fake_delete):
+    plan, calls = fake_delete
+    job = CleanupJob(str(tmp_path / "progress.json"))
+    job.request(["a"])
+    assert job.cancel()
+    assert job.status()["state"] == cleanup_job.CANCELLED
+    assert job.run(FakeBot()) is None
+    assert calls == []